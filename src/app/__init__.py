@@ -1,12 +1,17 @@
 import pygame
 import sys
 import os
+import time
 
+from app.profiler import Profiler, ProfilerOverlay
 from app.states import AppState
 from app.states.loading import Loading
 from app.states.menu import Menu
 from app.states.game import Game
+from app.states.menu.scoreboard import save_result
 from app.themes import Theme
+from app.text_cache import TextCache
+from app.themes.sprite import AnimatedSprite
 
 
 def resource_path(relative):
@@ -19,22 +24,68 @@ class App:
     # Constants
     WINDOW_CAPTION = "Pac-man"
     ANIMATION_FPS = 15
-    FPS = 60
     DEFAULT_SIZE = 1920, 1080
 
+    # Game logic is updated TICK_RATE times per second no matter how
+    # often screen is redrawn. FPS only limits rendering, 0 means no limit
+    TICK_RATE = 60
+    FPS = 60
+
+    # If updates can't keep up with real time, game slows down 
+    # instead of trying to catch up forever
+    MAX_UPDATES_PER_FRAME = 5
+
+    # Folder where every played session is saved to
+    REPLAY_PATH = 'replays'
+
+    PROFILER_TOGGLE_KEY = pygame.K_F3
+    PROFILER_DUMP_KEY = pygame.K_F4
+
+    # In dirty rects mode only parts of the screen reported by state 
+    # as changed are pushed to display, instead of the whole frame.
+    # Camera follows pacman, so while he moves the whole maze moves and
+    # frames are still pushed whole. It pays off only on screens that
+    # mostly stand still: loading, menu, pause and game before pacman starts
+    DIRTY_RECTS = False
+    DIRTY_RECTS_TOGGLE_KEY = pygame.K_F5
+
     # Default values for fields of App instance
     BG_COLOR = (20, 23, 42)
 
     def __init__(self):
-        self.running = True
+        self._setup()
         self.screen = pygame.display.set_mode(App.DEFAULT_SIZE, pygame.FULLSCREEN)
         pygame.display.set_caption(App.WINDOW_CAPTION)
+        self.state: AppState = Loading(self)
+
+    def _setup(self) -> None:
+        """ Sets fields that don't depend on display """
+
+        self.running = True
+        self.lag = 0.0
+        self.interpolation = 1.0
+        self.profiler = Profiler()
+        self.text_cache = TextCache()
+        self.profiler_overlay = ProfilerOverlay(self.profiler, self.text_cache)
+        self.dirty_rects = App.DIRTY_RECTS
+        self.full_update = True
 
         self.username = 'anonymous'
-        self.theme = Theme.load_theme(Theme.get_available()[0])
-        self.state: AppState = Loading(self)
+        self._theme = None
+        self._state = None
         self.bg_color = App.BG_COLOR
 
+    @property
+    def theme(self) -> Theme:
+        return self._theme
+
+    @theme.setter
+    def theme(self, new_theme: Theme) -> None:
+        self._theme = new_theme
+        AnimatedSprite.flipped_frames.clear()
+        if self._state is not None:
+            self._state.invalidate()
+
     @property
     def state(self) -> AppState:
         return self._state
@@ -43,21 +94,93 @@ class App:
     def state(self, new_state: AppState) -> None:
         self._state = new_state
         self._state.app = self
+        self.full_update = True
 
     def draw(self) -> None:
-        self.screen.fill(self.bg_color)
-        self.state.draw()
-        pygame.display.flip()
+        with self.profiler.section('draw'):
+            self.screen.fill(self.bg_color)
+            self.state.draw()
+            rects = self.state.dirty_rects()
+
+        # Overlay is redrawn every frame, so the whole screen is pushed
+        if self.profiler.enabled:
+            self.profiler_overlay.draw(self.screen, 1 / (App.FPS or App.TICK_RATE),
+                                       [str(AnimatedSprite.flipped_frames), str(self.text_cache)])
+            rects = None
+
+        with self.profiler.section('display'):
+            if not self.dirty_rects or self.full_update or rects is None:
+                pygame.display.flip()
+            elif rects:
+                pygame.display.update(rects)
+        self.full_update = False
+        self.profiler.end_frame()
 
     def handle_event(self, event) -> None:
         if event.type == pygame.QUIT:
+            if isinstance(self.state, Game):
+                self.save_replay(self.state)
             self.running = False
 
         elif event.type == pygame.VIDEORESIZE:
             size = event.w, event.h
             self.screen = pygame.display.set_mode(size, pygame.RESIZABLE)
+            self.full_update = True
+            self.state.invalidate()
+
+        elif event.type == pygame.KEYDOWN and event.key == App.PROFILER_TOGGLE_KEY:
+            self.profiler.toggle()
+            self.full_update = True
+        elif event.type == pygame.KEYDOWN and event.key == App.PROFILER_DUMP_KEY:
+            if self.profiler.frames:
+                self.profiler_overlay.show_message(f'Profile saved to {self.profiler.dump()}')
+        elif event.type == pygame.KEYDOWN and event.key == App.DIRTY_RECTS_TOGGLE_KEY:
+            self.dirty_rects = not self.dirty_rects
         else:
             self.state.handle_event(event)
 
     def update(self) -> None:
-        self.state.update()
\ No newline at end of file
+        with self.profiler.section('update'):
+            self.state.update()
+
+    def advance(self, seconds: float) -> None:
+        """ Runs as many updates as fit into given amount of real time.
+        Time left over is kept for the next call, and its fraction of
+        the tick is stored in interpolation, so states can draw moving 
+        objects between their last two positions
+
+        Args:
+            seconds (float): Time passed since the previous call
+        """
+
+        tick_length = 1 / App.TICK_RATE
+        self.lag += seconds
+
+        updates = 0
+        while self.lag >= tick_length and self.running:
+            if updates == App.MAX_UPDATES_PER_FRAME:
+                self.lag = 0.0
+                break
+
+            self.update()
+            self.lag -= tick_length
+            updates += 1
+
+        self.interpolation = self.lag / tick_length
+
+    def save_replay(self, game: Game) -> None:
+        """ Saves session that ended in given game to REPLAY_PATH """
+
+        replay = game.recorder.finish(game)
+        name = f'{time.strftime("%Y%m%d-%H%M%S")}-{replay.seed:08x}.rep'
+        try:
+            replay.save(os.path.join(resource_path(App.REPLAY_PATH), name))
+        except OSError:
+            # Losing replay shouldn't break the game
+            pass
+
+    def finish_game(self, game: Game) -> None:
+        """ Is called when game is over """
+        save_result(self.username, game.score)
+        self.save_replay(game)
+        self.state = Menu(self)
\ No newline at end of file
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import app
+import csv
+import os
+import time
+import pygame
+from array import array
+from contextlib import nullcontext
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.text_cache import TextCache
+
+
+class _Section:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler: Profiler, name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.profiler.add(self.name, perf_counter() - self.start)
+
+
+class Profiler:
+    """ Keeps how long named sections of code took during the last
+    HISTORY frames. Every section has its own ring buffer of per-frame
+    totals. While profiler is disabled, sections cost almost nothing
+    """
+
+    HISTORY = 240
+    FRAME = 'frame'
+    PERCENTILES = 50, 99
+    DUMP_PATH = 'profiles'
+
+    # Returned by section() while disabled
+    _NO_SECTION = nullcontext()
+
+    def __init__(self):
+        self.enabled = False
+        self.frame_idx = 0
+        self.frames = 0
+        self._history: dict[str, array] = {Profiler.FRAME: self._new_buffer()}
+        self._current: dict[str, float] = {}
+        self._frame_start = perf_counter()
+
+    def _new_buffer(self) -> array:
+        return array('d', [0.0]) * Profiler.HISTORY
+
+    @property
+    def sections(self) -> list[str]:
+        return list(self._history)
+
+    def toggle(self) -> None:
+        self.enabled = not self.enabled
+        self.frame_idx = 0
+        self.frames = 0
+        self._history = {Profiler.FRAME: self._new_buffer()}
+        self._current.clear()
+        self._frame_start = perf_counter()
+
+    def section(self, name: str):
+        """ Context manager measuring the code inside it. Time of all
+        sections with the same name is summed up until the end of frame
+        """
+
+        if not self.enabled:
+            return Profiler._NO_SECTION
+        return _Section(self, name)
+
+    def add(self, name: str, seconds: float) -> None:
+        self._current[name] = self._current.get(name, 0.0) + seconds
+
+    def end_frame(self) -> None:
+        """ Stores totals of the finished frame and starts a new one """
+
+        if not self.enabled:
+            return
+
+        now = perf_counter()
+        self._current[Profiler.FRAME] = now - self._frame_start
+        self._frame_start = now
+
+        for name in self._current:
+            if name not in self._history:
+                self._history[name] = self._new_buffer()
+        for name, buffer in self._history.items():
+            buffer[self.frame_idx] = self._current.get(name, 0.0)
+
+        self._current.clear()
+        self.frame_idx = (self.frame_idx + 1) % Profiler.HISTORY
+        self.frames = min(self.frames + 1, Profiler.HISTORY)
+
+    def history(self, name: str) -> list[float]:
+        """ Section times of the stored frames, from oldest to newest """
+
+        buffer = self._history[name]
+        if self.frames < Profiler.HISTORY:
+            return buffer[:self.frames].tolist()
+        return (buffer[self.frame_idx:] + buffer[:self.frame_idx]).tolist()
+
+    def last(self, name: str) -> float:
+        return self._history[name][self.frame_idx - 1] if self.frames else 0.0
+
+    def percentile(self, name: str, p: float) -> float:
+        times = sorted(self.history(name))
+        if not times:
+            return 0.0
+        return times[min(len(times) - 1, int(len(times) * p / 100))]
+
+    def dump(self) -> str:
+        """ Writes stored frames to CSV file in DUMP_PATH,
+        one row per frame in milliseconds. Returns path of the file
+        """
+
+        dump_path = app.resource_path(Profiler.DUMP_PATH)
+        os.makedirs(dump_path, exist_ok=True)
+        path = os.path.join(dump_path, f'{time.strftime("%Y%m%d-%H%M%S")}.csv')
+
+        names = self.sections
+        columns = [self.history(name) for name in names]
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['index'] + [f'{name}_ms' for name in names])
+            for idx, row in enumerate(zip(*columns)):
+                writer.writerow([idx] + [f'{seconds * 1000:.3f}' for seconds in row])
+        return path
+
+
+class ProfilerOverlay:
+    """ Table of section times and graph of frame times. Panel is
+    made once and reused. Text changes every frame, so it's rendered
+    again only once in REFRESH_FRAMES frames, and only the graph is
+    drawn every frame
+    """
+
+    FONT = pygame.font.SysFont('Consolas', 18)
+    FG_COLOR = (240, 240, 240)
+    BG_COLOR = (0, 0, 0, 180)
+    GRAPH_COLOR = (90, 200, 120)
+    SLOW_FRAME_COLOR = (220, 70, 70)
+    BUDGET_COLOR = (240, 200, 60)
+    PADDING = 10
+    GRAPH_HEIGHT = 80
+    REFRESH_FRAMES = 15
+
+    # Frame time at the top of the graph
+    GRAPH_SCALE_MS = 50
+
+    def __init__(self, profiler: Profiler, text_cache: TextCache):
+        self.profiler = profiler
+        self.text_cache = text_cache
+        self.message = None
+        self._panel = None
+        self._graph_top = 0
+        self._frames_until_refresh = 0
+
+    def show_message(self, message: str) -> None:
+        """ Shows line of text under the notes, until the next message """
+
+        self.message = message
+        self._frames_until_refresh = 0
+
+    def _render_text(self, text: str) -> pygame.Surface:
+        return self.text_cache.render(ProfilerOverlay.FONT, text, True, ProfilerOverlay.FG_COLOR)
+
+    def _refresh(self, notes: list[str]) -> None:
+        """ Renders table and notes to the panel """
+
+        profiler = self.profiler
+        font = ProfilerOverlay.FONT
+        rows = [('section, ms', 'last') + tuple(f'p{p}' for p in Profiler.PERCENTILES)]
+        for name in profiler.sections:
+            values = [profiler.last(name)] + [profiler.percentile(name, p) for p in Profiler.PERCENTILES]
+            rows.append((name,) + tuple(f'{value * 1000:.2f}' for value in values))
+        if self.message is not None:
+            notes = list(notes) + [self.message]
+
+        # Font isn't necessarily monospace, so every column is aligned separately
+        name_width = max(font.size(row[0])[0] for row in rows) + ProfilerOverlay.PADDING
+        value_width = font.size('0000.00')[0] + ProfilerOverlay.PADDING
+        line_height = font.get_linesize()
+        table_width = name_width + value_width * (len(rows[0]) - 1)
+
+        notes_width = max((font.size(note)[0] for note in notes), default=0)
+        width = max(table_width, Profiler.HISTORY, notes_width) + 2 * ProfilerOverlay.PADDING
+        height = len(rows) * line_height + ProfilerOverlay.GRAPH_HEIGHT + 3 * ProfilerOverlay.PADDING
+        self._graph_top = height - ProfilerOverlay.PADDING - ProfilerOverlay.GRAPH_HEIGHT
+        if notes:
+            height += len(notes) * line_height + ProfilerOverlay.PADDING
+
+        if self._panel is None or self._panel.get_size() != (width, height):
+            self._panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel = self._panel
+        panel.fill(ProfilerOverlay.BG_COLOR)
+
+        for row_idx, row in enumerate(rows):
+            y = ProfilerOverlay.PADDING + row_idx * line_height
+            panel.blit(self._render_text(row[0]), (ProfilerOverlay.PADDING, y))
+            for column, value in enumerate(row[1:], 1):
+                text = self._render_text(value)
+                right = ProfilerOverlay.PADDING + name_width + value_width * column
+                panel.blit(text, text.get_rect(topright=(right, y)))
+
+        for note_idx, note in enumerate(notes):
+            y = self._graph_top + ProfilerOverlay.GRAPH_HEIGHT + ProfilerOverlay.PADDING + note_idx * line_height
+            panel.blit(self._render_text(note), (ProfilerOverlay.PADDING, y))
+
+    def _draw_graph(self, budget: float) -> None:
+        """ Draws graph of frame times, one column per frame """
+
+        panel = self._panel
+        graph_bottom = self._graph_top + ProfilerOverlay.GRAPH_HEIGHT
+        panel.fill(ProfilerOverlay.BG_COLOR, (ProfilerOverlay.PADDING, self._graph_top, 
+                                              Profiler.HISTORY, ProfilerOverlay.GRAPH_HEIGHT + 1))
+
+        ms_to_px = ProfilerOverlay.GRAPH_HEIGHT / ProfilerOverlay.GRAPH_SCALE_MS
+        for x, seconds in enumerate(self.profiler.history(Profiler.FRAME)):
+            color = ProfilerOverlay.SLOW_FRAME_COLOR if seconds > budget else ProfilerOverlay.GRAPH_COLOR
+            bar = min(ProfilerOverlay.GRAPH_HEIGHT, seconds * 1000 * ms_to_px)
+            pygame.draw.line(panel, color, (ProfilerOverlay.PADDING + x, graph_bottom),
+                             (ProfilerOverlay.PADDING + x, graph_bottom - bar))
+
+        budget_y = graph_bottom - min(ProfilerOverlay.GRAPH_HEIGHT, budget * 1000 * ms_to_px)
+        pygame.draw.line(panel, ProfilerOverlay.BUDGET_COLOR, (ProfilerOverlay.PADDING, budget_y),
+                         (ProfilerOverlay.PADDING + Profiler.HISTORY, budget_y))
+
+    def draw(self, screen: pygame.Surface, budget: float, notes: list[str] = ()) -> None:
+        """ Draws overlay in the top left corner of the screen
+
+        Args:
+            screen (pygame.Surface): Surface to draw on
+            budget (float): Time in seconds one frame should take at most
+            notes (list[str], optional): Lines of other stats shown under the graph
+        """
+
+        if self._frames_until_refresh == 0:
+            self._refresh(notes)
+            self._frames_until_refresh = ProfilerOverlay.REFRESH_FRAMES
+        self._frames_until_refresh -= 1
+
+        self._draw_graph(budget)
+        screen.blit(self._panel, (0, 0))
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import pygame
+from time import perf_counter
+from typing import Callable, Optional, Union
+from app import App
+from app.states.game import Game
+from app.themes import Theme
+
+# Called before every tick with game and number of the tick, 
+# returns new direction for pacman or None to keep going.
+# Several directions pressed before one tick come as a tuple
+InputSource = Callable[[Game, int], Union[int, tuple[int, ...], None]]
+
+
+class SimulationResult:
+    def __init__(self, score: int, lives_lost: int, levels_cleared: int, 
+                 ticks: int, game_over: bool, seconds: float):
+        self.score = score
+        self.lives_lost = lives_lost
+        self.levels_cleared = levels_cleared
+        self.ticks = ticks
+        self.game_over = game_over
+        self.seconds = seconds
+
+    @property
+    def ticks_per_second(self) -> float:
+        return self.ticks / self.seconds if self.seconds > 0 else float('inf')
+
+    def as_dict(self) -> dict:
+        return {
+            'score': self.score,
+            'lives_lost': self.lives_lost,
+            'levels_cleared': self.levels_cleared,
+            'ticks': self.ticks,
+            'game_over': self.game_over,
+        }
+
+
+class HeadlessApp(App):
+    """ Runs game logic without display. Nothing is drawn, 
+    and game is updated as fast as possible instead of 
+    App.TICK_RATE times per second 
+    """
+
+    # Game needs screen size to position creatures, 
+    # but nothing is ever drawn on it
+    SCREEN_SIZE = 1, 1
+
+    def __init__(self, theme: Theme, input_source: InputSource, seed: Optional[int] = None,
+                 grid: Optional[list[list[int]]] = None):
+        self._setup()
+        self.screen = pygame.Surface(HeadlessApp.SCREEN_SIZE)
+        self.username = 'headless'
+        self.theme = theme
+
+        self.input_source = input_source
+        self.ticks = 0
+        self.levels_cleared = 0
+        self.state = Game(self, seed=seed, grid=grid)
+        self.start_lives = self.state.lives
+
+    def draw(self) -> None:
+        pass
+
+    def finish_game(self, game: Game) -> None:
+        self.running = False
+
+    def update(self) -> None:
+        game = self.state
+
+        directions = self.input_source(game, self.ticks)
+        if isinstance(directions, int):
+            directions = directions,
+        if directions and not game.is_paused:
+            for direction in directions:
+                game.change_direction(direction)
+
+        game.update()
+        self.ticks += 1
+
+        # Game replaces itself with new one when level is cleared
+        if self.running and self.state is not game:
+            self.levels_cleared += 1
+
+    def run(self, max_ticks: int) -> SimulationResult:
+        """ Updates game until it's over or max_ticks have passed """
+
+        start = perf_counter()
+        while self.running and self.ticks < max_ticks:
+            self.update()
+
+        return SimulationResult(
+            score=self.state.score,
+            lives_lost=self.start_lives - self.state.lives,
+            levels_cleared=self.levels_cleared,
+            ticks=self.ticks,
+            game_over=not self.running,
+            seconds=perf_counter() - start
+        )
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import csv
+from itertools import product
+from multiprocessing import Pool
+from typing import Iterator, Optional
+from app.simulation import HeadlessApp
+from app.simulation.bots import RandomBot
+from app.states.game.ghost import Blinky, Clyde, GhostBase, Inky, Pinky
+from app.states.game.maze import Maze
+from app.states.game.pacman import Pacman
+from app.themes import Theme
+
+# Classes with constants that can be changed for a batch of games
+TUNABLE_CLASSES = {cls.__name__: cls for cls in (GhostBase, Blinky, Inky, Pinky, Clyde, Pacman)}
+
+RESULT_COLUMNS = ['score', 'lives_lost', 'levels_cleared', 'ticks', 'game_over']
+
+# Theme and level loaded once by each worker process
+_worker_theme: Optional[Theme] = None
+_worker_grid: Optional[list[list[int]]] = None
+
+
+class BatchJob:
+    """ Single game of the batch """
+
+    def __init__(self, seed: int, parameters: dict[str, float], max_ticks: int):
+        """
+        Args:
+            seed (int): Seed of the game and of the bot playing it
+            parameters (dict[str, float]): Values of game constants in format 
+            {'Blinky.SECONDS_FOR_CELL': 0.4}
+            max_ticks (int): Game is stopped after this amount of ticks
+        """
+
+        self.seed = seed
+        self.parameters = parameters
+        self.max_ticks = max_ticks
+
+
+def parse_parameter(name: str) -> tuple[type, str]:
+    """ Finds class and attribute by name like 'Blinky.SECONDS_FOR_CELL' """
+
+    class_name, _, attribute = name.partition('.')
+    cls = TUNABLE_CLASSES.get(class_name)
+    if cls is None or not attribute.isupper() or not hasattr(cls, attribute):
+        raise ValueError(f'Unknown game parameter: {name}')
+    return cls, attribute
+
+
+def parameter_grid(values: dict[str, list[float]]) -> list[dict[str, float]]:
+    """ Returns every combination of given parameter values """
+
+    for name in values:
+        parse_parameter(name)
+
+    names = list(values)
+    return [dict(zip(names, combination)) for combination in product(*values.values())]
+
+
+def _init_worker(theme_name: str, level_name: str):
+    global _worker_theme, _worker_grid
+
+    # Only fonts are needed for game module to be imported
+    import pygame
+    pygame.font.init()
+
+    _worker_theme = Theme.load_theme(theme_name, headless=True)
+    _worker_grid = Maze._load_level_csv(level_name)
+
+
+def _run_job(job: BatchJob) -> dict:
+    original = {}
+    for name, value in job.parameters.items():
+        cls, attribute = parse_parameter(name)
+        original[(cls, attribute)] = getattr(cls, attribute)
+        setattr(cls, attribute, value)
+
+    try:
+        app = HeadlessApp(_worker_theme, RandomBot(job.seed), seed=job.seed, grid=_worker_grid)
+        result = app.run(job.max_ticks)
+    finally:
+        for (cls, attribute), value in original.items():
+            setattr(cls, attribute, value)
+
+    row = {'seed': job.seed, **job.parameters, **result.as_dict()}
+    row['ticks_per_second'] = result.ticks_per_second
+    return row
+
+
+def run_batch(jobs: list[BatchJob], workers: int, theme_name: str, 
+              level_name: str = 'classic.csv') -> Iterator[dict]:
+    """ Runs games on a pool of worker processes. Results are
+    yielded in order of completion, not in order of jobs
+
+    Args:
+        jobs (list[BatchJob]): Games to run
+        workers (int): Amount of processes. If 1, games are run in this process
+        theme_name (str): Theme to take sprite metadata from
+        level_name (str): Level file from levels folder to play on
+    """
+
+    if workers <= 1:
+        _init_worker(theme_name, level_name)
+        yield from map(_run_job, jobs)
+        return
+
+    # Several jobs are sent to worker at once, so processes 
+    # spend their time playing instead of waiting for work
+    chunksize = max(1, len(jobs) // (workers * 8))
+    with Pool(workers, initializer=_init_worker, initargs=(theme_name, level_name)) as pool:
+        yield from pool.imap_unordered(_run_job, jobs, chunksize=chunksize)
+
+
+class BatchResults:
+    """ Results of games stored by columns """
+
+    def __init__(self, parameter_names: list[str]):
+        self.columns = ['seed'] + parameter_names + RESULT_COLUMNS
+        self.data = {column: [] for column in self.columns}
+
+    def __len__(self):
+        return len(self.data['seed'])
+
+    def add(self, row: dict):
+        for column in self.columns:
+            self.data[column].append(row[column])
+
+    def mean(self, column: str) -> float:
+        values = self.data[column]
+        return sum(values) / len(values) if values else 0
+
+    def write_csv(self, path: str):
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(self.columns)
+            writer.writerows(zip(*(self.data[column] for column in self.columns)))
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from random import Random
+from typing import TYPE_CHECKING, Optional, Union
+from utilities.direction import Direction, opposite
+
+if TYPE_CHECKING:
+    from app.states.game import Game
+
+
+class RandomBot:
+    """ Chooses random direction every time pacman enters new cell,
+    preferring not to turn back
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        self.rng = Random(seed)
+        self._last_cell = None
+
+    def __call__(self, game: Game, tick: int) -> Optional[int]:
+        pacman = game.pacman
+        if pacman.cell == self._last_cell:
+            return None
+        self._last_cell = pacman.cell
+
+        cell = game.maze.cell(pacman.cell)
+        options = [d for d in (Direction.N, Direction.E, Direction.S, Direction.W)
+                   if cell.can_turn(d)]
+        forward = [d for d in options if d != opposite(pacman.direction)]
+        if forward:
+            options = forward
+
+        return self.rng.choice(options) if options else None
+
+
+class ScriptedInput:
+    """ Presses keys at given ticks """
+
+    def __init__(self, commands: dict[int, Union[int, tuple[int, ...]]]):
+        """
+        Args:
+            commands (dict[int, Union[int, tuple[int, ...]]]): Direction, or 
+            several directions in order, for each tick at which it should be pressed
+        """
+
+        self.commands = commands
+
+    def __call__(self, game: Game, tick: int) -> Union[int, tuple[int, ...], None]:
+        return self.commands.get(tick)
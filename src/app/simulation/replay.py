@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from typing import Optional
+from app.simulation import HeadlessApp, SimulationResult
+from app.simulation.bots import ScriptedInput
+from app.states.game.replay import Replay
+from app.themes import Theme
+
+
+def play_replay(replay: Replay, theme: Optional[Theme] = None) -> tuple[SimulationResult, bool]:
+    """ Plays recorded session again without display, as fast as possible
+
+    Args:
+        replay (Replay): Recorded session
+        theme (Theme, optional): Theme to take sprite metadata from. By default
+        theme of the recorded session is loaded in headless mode.
+
+    Returns:
+        tuple[SimulationResult, bool]: Result of the game and whether it
+        ended up in exactly the same state as the recorded one
+    """
+
+    if theme is None:
+        theme = Theme.load_theme(replay.theme_name, headless=True)
+
+    app = HeadlessApp(theme, ScriptedInput(replay.inputs_by_tick()), seed=replay.seed)
+    result = app.run(replay.ticks)
+    return result, app.ticks == replay.ticks and replay.matches(app.state)
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 if TYPE_CHECKING:
+    import pygame
     from app import App
 
 
@@ -22,3 +23,16 @@ class AppState(ABC):
     @abstractmethod
     def handle_event(self, event) -> None:
         pass
+
+    def invalidate(self) -> None:
+        """ Is called when theme or display mode changes, so
+        state can drop surfaces it has pre-rendered 
+        """
+        pass
+
+    def dirty_rects(self) -> Optional[list[pygame.Rect]]:
+        """ Is called after every draw. Returns parts of the screen
+        that changed since the previous frame, or None if it 
+        changed as a whole 
+        """
+        return None
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.states.game import Game
+    from app.themes.sprite import AnimatedSprite
+
+
+class AnimationClock:
+    """ Tells which frame every sprite shows, counting game ticks, so
+    animations don't depend on how often the screen is redrawn.
+    Sprites start at random frames called phases: frame of sprite with
+    phase p is (step + p) % amount, where step is amount of animation
+    frames passed since the game started
+    """
+
+    def __init__(self, game: Game):
+        self.game = game
+        self.ticks_per_frame = max(1, game.app.TICK_RATE // game.app.ANIMATION_FPS)
+
+    @property
+    def step(self) -> int:
+        return self.game.ticks // self.ticks_per_frame
+
+    def frame_idx(self, sprite: AnimatedSprite, phase: int = 0) -> int:
+        return (self.step + phase) % sprite.amount
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from array import array
+from app.states.game.maze import CellFlag
+
+
+class Collectibles:
+    """ Dots, energizers and fruits left in the maze. Every cell keeps
+    bits of collectibles lying in it, and amount of every kind is
+    counted, so checking, eating and counting are constant time
+    """
+
+    KINDS = CellFlag.DOT, CellFlag.ENERGIZER, CellFlag.FRUIT
+
+    def __init__(self, cells: array):
+        """
+        Args:
+            cells (array): Cells of the maze, collectibles are taken from their flags
+        """
+
+        # Collectible bits of every cell, the same bits as in CellFlag
+        self.flags = array('H', (n & CellFlag.COLLECTIBLE for n in cells))
+
+        self._counts = {kind: 0 for kind in Collectibles.KINDS}
+        self._remaining = 0
+        for n in self.flags:
+            if n:
+                self._remaining += 1
+                for kind in Collectibles.KINDS:
+                    if n & kind:
+                        self._counts[kind] += 1
+
+    @property
+    def remaining(self) -> int:
+        """ Amount of cells that still have collectibles """
+        return self._remaining
+
+    def count(self, kind: int) -> int:
+        """ Amount of collectibles of given kind left, kind is one of KINDS """
+        return self._counts[kind]
+
+    def has(self, idx: int, kind: int = CellFlag.COLLECTIBLE) -> bool:
+        """ Whether cell with given index has collectible of given kind """
+        return bool(self.flags[idx] & kind)
+
+    def consume(self, idx: int) -> int:
+        """ Removes everything from the cell
+
+        Returns:
+            int: Bits of collectibles that were in the cell
+        """
+
+        eaten = self.flags[idx]
+        if eaten:
+            self.flags[idx] = 0
+            self._remaining -= 1
+            for kind in Collectibles.KINDS:
+                if eaten & kind:
+                    self._counts[kind] -= 1
+        return eaten
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from app.states.game.maze import MazeCell
+from app.states.game.moving_creature import MovingCreature
+from utilities.direction import Direction
+
+
+class CollisionGrid:
+    """ Finds creatures touching each other in maze space. Creature
+    touches others with its collision segment: line that goes through
+    its position along the axis it faces, REACH cells to both sides.
+    Creatures are hashed by the cell nearest to them, so exact check
+    is done only for creatures in nearby cells
+    """
+
+    # Half of collision segment in cells, so the segment is as wide as creature
+    REACH = MovingCreature.SPRITE_WIDTH / MazeCell.CELL_WIDTH
+
+    # Cells, relative to the cell of creature, where creatures touching it
+    # can be. Crossing segments are at most REACH < 1 apart along both axes,
+    # segments on the same line are at most 2 * REACH < 2 apart along it.
+    # Rounding to the nearest cell adds at most 1 to both distances
+    NEIGHBORHOOD = [(dx, dy) for dx in range(-1, 2) for dy in range(-1, 2)] + \
+                   [(-2, 0), (2, 0), (0, -2), (0, 2)]
+
+    def __init__(self):
+        self._creatures: list[MovingCreature] = []
+        self._cells: dict[tuple[int, int], list[int]] = {}
+
+    @staticmethod
+    def box(creature: MovingCreature) -> tuple[float, float, float, float]:
+        """ Returns min x, min y, max x and max y of collision segment """
+
+        x, y = creature.mz_position
+        if creature.direction in [Direction.E, Direction.W]:
+            return x - CollisionGrid.REACH, y, x + CollisionGrid.REACH, y
+        return x, y - CollisionGrid.REACH, x, y + CollisionGrid.REACH
+
+    def rebuild(self, creatures: list[MovingCreature]) -> None:
+        """ Hashes creatures at their current positions """
+
+        self._creatures = list(creatures)
+
+        cells = self._cells = {}
+        for idx, creature in enumerate(self._creatures):
+            x, y = creature.mz_position
+            cell = round(x), round(y)
+            if cell in cells:
+                cells[cell].append(idx)
+            else:
+                cells[cell] = [idx]
+
+    def touching(self, creature: MovingCreature) -> list[MovingCreature]:
+        """ Returns hashed creatures touched by given one,
+        in the same order they were passed to rebuild
+        """
+
+        x, y = creature.mz_position
+        x, y = round(x), round(y)
+        candidates = []
+        for dx, dy in CollisionGrid.NEIGHBORHOOD:
+            candidates += self._cells.get((x + dx, y + dy), ())
+        if not candidates:
+            return []
+
+        # Segments are parallel to axes, so they
+        # intersect only if their bounding boxes do
+        min_x, min_y, max_x, max_y = CollisionGrid.box(creature)
+        touched = []
+        for idx in sorted(candidates):
+            other = self._creatures[idx]
+            other_min_x, other_min_y, other_max_x, other_max_y = CollisionGrid.box(other)
+            if other_min_x <= max_x and min_x <= other_max_x and \
+               other_min_y <= max_y and min_y <= other_max_y and other is not creature:
+                touched.append(other)
+        return touched
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import pygame
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from app.states.game import Game
+
+
+class DirtyRegions:
+    """ Finds parts of the screen that changed since the previous frame.
+    While camera stands still, only creatures, eaten collectibles
+    and info panel change. Once camera moves, the whole maze moves
+    with it and the whole screen is changed. Camera follows pacman,
+    so that's almost every frame while he's moving
+    """
+
+    def __init__(self, game: Game):
+        self.game = game
+        self.invalidate()
+
+    def invalidate(self):
+        """ Forgets the previous frame, so the next one is changed as a whole """
+
+        self._view = None
+        self._step = None
+        self._panel = None
+        self._creature_rects: list[pygame.Rect] = []
+
+    def _is_animated(self) -> bool:
+        """ Whether maze sprites drawn behind creatures change their frames """
+
+        theme = self.game.app.theme
+        return any(sprite.amount > 1 for sprites in
+                   (theme.floor, theme.wall, theme.dot, theme.energizer, theme.fruit)
+                   for sprite in sprites)
+
+    def _collectible_rect(self, mz_coords: tuple[int, int]) -> pygame.Rect:
+        """ Part of the screen any collectible of the cell can cover """
+
+        theme = self.game.app.theme
+        w = h = 0
+        for sprites in (theme.dot, theme.energizer, theme.fruit):
+            for sprite in sprites:
+                for idx in range(sprite.amount):
+                    frame_w, frame_h = sprite.frame(idx).get_size()
+                    w, h = max(w, frame_w), max(h, frame_h)
+
+        # Collectibles are baked into chunks of static layer,
+        # which may shift them by a pixel from the cell center
+        rect = pygame.Rect(0, 0, w + 2, h + 2)
+        rect.center = self.game.maze.get_cell_center(mz_coords)
+        return rect
+
+    def collect(self) -> Optional[list[pygame.Rect]]:
+        """ Is called after game is drawn. Returns changed parts
+        of the screen, or None if the whole screen changed
+        """
+
+        game = self.game
+        eaten_cells, game.eaten_cells = game.eaten_cells, []
+
+        view = game.app.screen.get_size(), game.maze.ne_corner, game.is_paused
+        step = game.animation.step
+        panel = game.hud.panel
+        creature_rects = [creature.screen_rect() for creature in game.creatures]
+
+        prev_view, prev_step, prev_panel = self._view, self._step, self._panel
+        prev_creature_rects = self._creature_rects
+        self._view, self._step, self._panel = view, step, panel
+        self._creature_rects = creature_rects
+
+        if view != prev_view or (step != prev_step and self._is_animated()):
+            return None
+
+        # Paused game is the same picture every frame
+        if game.is_paused:
+            return []
+
+        rects = prev_creature_rects + creature_rects
+        rects += [self._collectible_rect(cell) for cell in eaten_cells]
+        if panel is not prev_panel:
+            rects += [pygame.Rect(pos, surface.get_size()) for surface, pos in (prev_panel, panel)]
+        return rects
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from array import array
+from collections import deque
+from typing import TYPE_CHECKING, Optional
+from app.states.game.maze import CellFlag
+from utilities.direction import Direction
+
+if TYPE_CHECKING:
+    from app.states.game.maze import Maze
+
+
+class FlowField:
+    """ Shortest paths from every cell of the maze to single target.
+    Field is a breadth-first search started from the target, which
+    is expanded only as far as needed to answer queries, and is resumed
+    from where it stopped on the next query. Changing the target doesn't
+    clear any arrays, so any amount of chasers costs O(1) on average
+    """
+
+    # Step from cell to its neighbor and its direction. Same order as
+    # the order in which ghosts search for path, so equally short
+    # paths are chosen the same way as by search and NavigationTable
+    STEPS = [
+        ((0, 1), Direction.S),
+        ((1, 0), Direction.W),
+        ((0, -1), Direction.N),
+        ((-1, 0), Direction.E)
+    ]
+
+    def __init__(self, maze: Maze):
+        self.maze = maze
+        self.target = None
+        self.generation = 0
+
+        size = len(maze.cells)
+        self._stamps = array('I', bytes(4 * size))
+        self._distances = array('I', bytes(4 * size))
+        self._queue = deque()
+
+    def set_target(self, target: tuple[int, int]):
+        """ Starts new search from given cell. Does nothing
+        if target hasn't changed since last call
+        """
+
+        if target == self.target:
+            return
+
+        self.target = target
+        self.generation += 1
+        self._queue.clear()
+
+        if not self.maze.is_wall(target):
+            idx = self.maze.index(target)
+            self._visit(idx, 0)
+            self._queue.append(idx)
+
+    def _visit(self, idx: int, distance: int):
+        self._stamps[idx] = self.generation
+        self._distances[idx] = distance
+
+    def _reached(self, idx: int) -> bool:
+        return self._stamps[idx] == self.generation
+
+    def _expand_until(self, idx: int):
+        """ Continues the search until given cell is reached
+        or there is nothing left to search
+        """
+
+        w, h = self.maze.width_in_cells, self.maze.height_in_cells
+        cells = self.maze.cells
+        q = self._queue
+
+        while q and not self._reached(idx):
+            u = q.popleft()
+            u_y, u_x = divmod(u, w)
+            distance = self._distances[u] + 1
+            for (dx, dy), _ in FlowField.STEPS:
+                v_x, v_y = u_x + dx, u_y + dy
+                if not (0 <= v_x < w and 0 <= v_y < h):
+                    continue
+
+                v = v_y * w + v_x
+                if self._reached(v) or cells[v] & CellFlag.WALL:
+                    continue
+
+                self._visit(v, distance)
+                q.append(v)
+
+    def _lookup(self, cell: tuple[int, int], target: tuple[int, int]) -> Optional[int]:
+        self.set_target(target)
+        if self.maze.is_wall(cell):
+            return None
+
+        idx = self.maze.index(cell)
+        self._expand_until(idx)
+        return idx if self._reached(idx) else None
+
+    def next_direction(self, cell: tuple[int, int], target: tuple[int, int]) -> Optional[int]:
+        """ Direction of the first step from cell towards target.
+        Returns None if cell is the target or target can't be reached
+        """
+
+        idx = self._lookup(cell, target)
+        if idx is None or self._distances[idx] == 0:
+            return None
+
+        # Search reaches all cells one step closer to target before the
+        # cell itself, so its neighbors are already known here
+        w, h = self.maze.width_in_cells, self.maze.height_in_cells
+        x, y = cell
+        distance = self._distances[idx] - 1
+        for (dx, dy), direction in FlowField.STEPS:
+            v_x, v_y = x + dx, y + dy
+            if not (0 <= v_x < w and 0 <= v_y < h):
+                continue
+
+            v = v_y * w + v_x
+            if self._reached(v) and self._distances[v] == distance:
+                return direction
+
+    def distance(self, cell: tuple[int, int], target: tuple[int, int]) -> float:
+        """ Length of the shortest path from cell to target, or inf if there's none """
+
+        idx = self._lookup(cell, target)
+        return float('inf') if idx is None else self._distances[idx]
@@ -1,12 +1,10 @@
 from __future__ import annotations
 
-import pygame
 from abc import abstractmethod
-from math import inf
-from queue import Queue
-from random import choice, randrange
-from typing import TYPE_CHECKING
+from collections import deque
+from typing import TYPE_CHECKING, Union
 from utilities.direction import *
+from app.states.game.maze import CellFlag
 from app.states.game.moving_creature import MovingCreature
 
 if TYPE_CHECKING:
@@ -35,7 +33,7 @@ class GhostBase(MovingCreature):
         self.scatter_goal = scatter_goal
         self.seconds_for_chase_mode = seconds_for_chase_mode
         self.seconds_for_scatter_mode = seconds_for_scatter_mode
-        self.change_time = pygame.time.get_ticks()
+        self.change_time = self.game.ticks
         self.mode = GhostMode.CHASE
 
     @abstractmethod
@@ -49,15 +47,19 @@ class GhostBase(MovingCreature):
             neighbors = []
             for d in (Direction.N, Direction.E, Direction.W, Direction.S):
                 neighbor = get_neighbor(self.cell, d)
-                if not self.game.maze.grid[neighbor[1]][neighbor[0]].is_wall:
+                neighbor = (
+                    neighbor[0] % self.game.maze.width_in_cells,
+                    neighbor[1] % self.game.maze.height_in_cells
+                )
+                if not self.game.maze.is_wall(neighbor):
                     neighbors.append(neighbor)
-            return choice(neighbors)
+            return self.game.rng.choice(neighbors)
         elif self.mode == GhostMode.CHASE:
             return self.get_chase_goal()
     
     def check_switch_mode(self):
-        current_time = pygame.time.get_ticks()
-        time_since_change = (current_time - self.change_time) / 1000
+        current_time = self.game.ticks
+        time_since_change = (current_time - self.change_time) / self.game.app.TICK_RATE
         if self.mode == GhostMode.CHASE and time_since_change >= self.seconds_for_chase_mode:
             self.mode = GhostMode.SCATTER
             self.change_time = current_time
@@ -75,29 +77,45 @@ class GhostBase(MovingCreature):
         if activate:
             self.mode = GhostMode.SCARE
             self.frames_per_cell = self.frames_per_cell * 3/2
-            self.sprite = choice(self.game.app.theme.enemy_scare)
-            self.frame_idx = randrange(0, self.sprite.amount)
+            self.sprite = self.game.rng.choice(self.game.app.theme.enemy_scare)
+            self.frame_phase = self.game.rng.randrange(0, self.sprite.amount)
         else:
-            self.mode = choice((GhostMode.CHASE, GhostMode.SCATTER))
+            self.mode = self.game.rng.choice((GhostMode.CHASE, GhostMode.SCATTER))
             self.frames_per_cell = self.frames_per_cell * 2/3
             self.sprite = self.regular_sprite
-            self.frmae_idx = randrange(0, self.sprite.amount)
+            self.frame_phase = self.game.rng.randrange(0, self.sprite.amount)
 
     def get_direction(self):
         self.check_switch_mode()
         goal = self.get_goal_cell()
 
+        # Everyone chasing pacman shares single search
+        if goal == self.game.pacman.cell:
+            return self.game.maze.pacman_flow_field.next_direction(self.cell, goal)
+
+        navigation = self.game.maze.navigation
+        if navigation is not None:
+            return navigation.next_direction(self.cell, goal)
+        return self.search_direction(goal)
+
+    def search_direction(self, goal: tuple[int, int]) -> Union[int, None]:
+        """ Finds first step of the shortest path to goal 
+        using breadth-first search. Returns None if ghost is
+        already there or goal can't be reached
+        """
+
         mz_w = self.game.maze.width_in_cells
         mz_h = self.game.maze.height_in_cells
+        cells = self.game.maze.cells
 
-        q = Queue()
-        q.put(self.cell)
+        q = deque()
+        q.append(self.cell)
         path = [[(-1, -1)] * mz_w for _ in range(mz_h)]
         path[self.cell[1]][self.cell[0]] = self.cell
         directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]
 
-        while not q.empty():
-            u = q.get()
+        while q:
+            u = q.popleft()
 
             if u == goal:
                 break
@@ -105,9 +123,13 @@ class GhostBase(MovingCreature):
             for d in directions:
                 v = u[0] + d[0], u[1] + d[1]
                 if 0 <= v[0] < mz_w and 0 <= v[1] < mz_h and path[v[1]][v[0]] == (-1, -1) and \
-                    not self.game.maze.grid[v[1]][v[0]].is_wall:
+                    not cells[v[1] * mz_w + v[0]] & CellFlag.WALL:
                     path[v[1]][v[0]] = u
-                    q.put(v)
+                    q.append(v)
+
+        if not (0 <= goal[0] < mz_w and 0 <= goal[1] < mz_h) or \
+            path[goal[1]][goal[0]] == (-1, -1):
+            return None
 
         direction = None
         bt_cell = goal
@@ -169,20 +191,9 @@ class Inky(GhostBase):
         d = pacman_pos[0] - blinky_pos[0], pacman_pos[1] - blinky_pos[1]
         goal = pacman_pos[0] + d[0], pacman_pos[1] + d[1]
 
-        mz_w, mz_h = self.game.maze.width_in_cells, self.game.maze.height_in_cells
-        if 0 <= goal[1] < mz_h and 0 <= goal[0] < mz_w and \
-            not self.game.maze.grid[goal[1]][goal[0]].is_wall:
+        if not self.game.maze.is_wall(goal):
             return goal
-        
-        min_dist = inf
-        min_dist_cell = None
-        for i, line in enumerate(self.game.maze.grid):
-            for j, cell in enumerate(line):
-                if not cell.is_wall and (abs(goal[0] - i) + abs(goal[1] - j)) < min_dist:
-                    min_dist = abs(goal[0] - i) + abs(goal[1] - j)
-                    min_dist_cell = (j, i)
-
-        return min_dist_cell
+        return self.game.maze.nearest_walkable(goal)
 
 
 class Pinky(GhostBase):
@@ -205,20 +216,22 @@ class Pinky(GhostBase):
         direction - movement direction
         """
         
+        cell = cell[0] % self.game.maze.width_in_cells, cell[1] % self.game.maze.height_in_cells
         neighbor = get_neighbor(cell, direction)
         neighbor = (
             neighbor[0] % self.game.maze.width_in_cells,
             neighbor[1] % self.game.maze.height_in_cells
         )
-        if not self.game.maze.grid[neighbor[1]][neighbor[0]].is_wall:
+        current_cell = self.game.maze.cell(cell)
+        if not self.game.maze.is_wall(neighbor):
             return neighbor, direction
-        elif self.game.maze.grid[cell[1]][cell[0]].can_turn(left(direction)) and \
-            self.game.maze.grid[cell[1]][cell[0]].can_turn(right(direction)):
-            direction = choice((left(direction), right(direction)))
+        elif current_cell.can_turn(left(direction)) and \
+            current_cell.can_turn(right(direction)):
+            direction = self.game.rng.choice((left(direction), right(direction)))
             return get_neighbor(cell, direction), direction
-        elif self.game.maze.grid[cell[1]][cell[0]].can_turn(left(direction)):
+        elif current_cell.can_turn(left(direction)):
             return get_neighbor(cell, left(direction)), direction
-        elif self.game.maze.grid[cell[1]][cell[0]].can_turn(right(direction)):
+        elif current_cell.can_turn(right(direction)):
             return get_neighbor(cell, right(direction)), direction
         else:
             return get_neighbor(cell, opposite(direction)), direction
@@ -229,7 +242,7 @@ class Pinky(GhostBase):
         cell, direction = self.game.pacman.cell, self.game.pacman.direction
         for _ in range(6):
             cell, direction = self.go_forward(cell, direction)
-        return cell
+        return cell[0] % self.game.maze.width_in_cells, cell[1] % self.game.maze.height_in_cells
 
 
 class Clyde(GhostBase):
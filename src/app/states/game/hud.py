@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import pygame
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from app.states.game import Game
+
+
+class Hud:
+    """ Info panel with score and lives, and overlay of paused game.
+    Both are drawn to their own layers, which are rebuilt only when
+    what they show or screen size changes
+    """
+
+    PAUSE_OVERLAY_BG = (0, 0, 0, 200)
+    PAUSE_OVERLAY_FG = (240, 240, 240)
+    PAUSE_OVERLAY_TEXT = "Game is paused"
+    PAUSE_OVERLAY_FONT = pygame.font.SysFont('Comic Sans MS', 72)
+
+    INFO_PANEL_WIDTH_OF_SCREEN = 0.5
+    INFO_PANEL_HEIGHT_OF_SCREEN = 0.1
+    INFO_PANEL_BORDER_RADIUS = 30
+    INFO_PANEL_BORDER_WIDTH = 5
+    INFO_PANEL_BG_COLOR = (0, 0, 0)
+    INFO_PANEL_FG_COLOR = (240, 240, 240)
+    INFO_PANEL_FONT = pygame.font.SysFont('Comic Sans MS', 48)
+
+    LIFE_SPRITE_WIDTH = 60
+    LIFE_SPRITE_PADDING = 20
+
+    def __init__(self, game: Game):
+        self.game = game
+        self.invalidate()
+
+    def invalidate(self):
+        """ Drops all layers. Should be called when theme changes """
+
+        self._panel_key = None
+        self._panel: Optional[tuple[pygame.Surface, tuple[int, int]]] = None
+        self._overlay: Optional[pygame.Surface] = None
+        self._paused_frame: Optional[pygame.Surface] = None
+
+    @property
+    def panel(self) -> Optional[tuple[pygame.Surface, tuple[int, int]]]:
+        """ Layer of info panel drawn last time and its position """
+        return self._panel
+
+    def _build_panel(self) -> tuple[pygame.Surface, tuple[int, int]]:
+        """ Draws info panel to surface as big as the panel
+        and everything on it. Returns surface and its position
+        """
+
+        game = self.game
+        sc_w, sc_h = game.app.screen.get_size()
+
+        panel_rect = pygame.Rect(
+            sc_w * (1 - Hud.INFO_PANEL_WIDTH_OF_SCREEN)/2, sc_h * (1 - Hud.INFO_PANEL_HEIGHT_OF_SCREEN),
+            sc_w * Hud.INFO_PANEL_WIDTH_OF_SCREEN, sc_h * Hud.INFO_PANEL_HEIGHT_OF_SCREEN
+        )
+        border_rect = panel_rect.inflate(0, Hud.INFO_PANEL_BORDER_WIDTH)
+        border_rect.top = panel_rect.top
+
+        score_text = game.app.text_cache.render(Hud.INFO_PANEL_FONT, f'{game.score} PTS', True, Hud.INFO_PANEL_FG_COLOR)
+        score_rect = score_text.get_rect(center=(sc_w * (1 - Hud.INFO_PANEL_WIDTH_OF_SCREEN/2)/2,
+                                                 sc_h * (1 - Hud.INFO_PANEL_HEIGHT_OF_SCREEN/2)))
+
+        life_sprite_center = sc_w * (1 + Hud.INFO_PANEL_WIDTH_OF_SCREEN/2)/2 - \
+                             game.lives * (Hud.LIFE_SPRITE_WIDTH + Hud.LIFE_SPRITE_PADDING)/2
+        life_frame = game.life_sprite.frame(game.animation.frame_idx(game.life_sprite, game.life_phase))
+        life_rects = []
+        for _ in range(game.lives):
+            life_rects.append(life_frame.get_rect(center=(life_sprite_center, sc_h * (1 - Hud.INFO_PANEL_HEIGHT_OF_SCREEN/2))))
+            life_sprite_center += Hud.LIFE_SPRITE_WIDTH + Hud.LIFE_SPRITE_PADDING
+
+        # Everything is drawn relative to the top left corner of the layer.
+        # Border goes below the screen, so its bottom side isn't seen
+        layer_rect = border_rect.unionall([score_rect] + life_rects).clip(game.app.screen.get_rect())
+        layer = pygame.Surface(layer_rect.size, pygame.SRCALPHA).convert_alpha()
+        layer.fill((0, 0, 0, 0))
+        offset = -layer_rect.x, -layer_rect.y
+
+        pygame.draw.rect(
+            layer,
+            Hud.INFO_PANEL_BG_COLOR,
+            panel_rect.move(offset),
+            border_top_left_radius=Hud.INFO_PANEL_BORDER_RADIUS,
+            border_top_right_radius=Hud.INFO_PANEL_BORDER_RADIUS
+        )
+        pygame.draw.rect(
+            layer,
+            Hud.INFO_PANEL_FG_COLOR,
+            border_rect.move(offset),
+            Hud.INFO_PANEL_BORDER_WIDTH,
+            border_top_left_radius=Hud.INFO_PANEL_BORDER_RADIUS,
+            border_top_right_radius=Hud.INFO_PANEL_BORDER_RADIUS
+        )
+
+        layer.blit(score_text, score_rect.move(offset))
+        for rect in life_rects:
+            layer.blit(life_frame, rect.move(offset))
+
+        return layer, layer_rect.topleft
+
+    def _build_overlay(self) -> pygame.Surface:
+        overlay = pygame.Surface(self.game.app.screen.get_size(), pygame.SRCALPHA).convert_alpha()
+        overlay.fill(Hud.PAUSE_OVERLAY_BG)
+        return overlay
+
+    def draw_paused_frame(self) -> bool:
+        """ Paused game doesn't change, so after it was drawn once,
+        the whole frame is only copied to screen. Returns False if
+        there's no such frame yet and game must be drawn as usual
+        """
+
+        screen = self.game.app.screen
+        if self._paused_frame is None or self._paused_frame.get_size() != screen.get_size():
+            return False
+        screen.blit(self._paused_frame, (0, 0))
+        return True
+
+    def draw(self):
+        """ Draws pause overlay if game is paused, and info panel """
+
+        game = self.game
+        screen = game.app.screen
+        sc_w, sc_h = screen.get_size()
+
+        if game.is_paused:
+            if self._overlay is None or self._overlay.get_size() != (sc_w, sc_h):
+                self._overlay = self._build_overlay()
+            screen.blit(self._overlay, (0, 0))
+
+            pause_text = game.app.text_cache.render(Hud.PAUSE_OVERLAY_FONT, Hud.PAUSE_OVERLAY_TEXT, True, Hud.PAUSE_OVERLAY_FG)
+            screen.blit(pause_text, pause_text.get_rect(center=(sc_w/2, sc_h/2)))
+
+        key = sc_w, sc_h, game.score, game.lives, game.animation.frame_idx(game.life_sprite, game.life_phase)
+        if key != self._panel_key:
+            self._panel_key = key
+            self._panel = self._build_panel()
+        surface, pos = self._panel
+        screen.blit(surface, pos)
+
+        self._paused_frame = screen.copy() if game.is_paused else None
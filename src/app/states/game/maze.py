@@ -3,13 +3,15 @@ from __future__ import annotations
 import csv
 import os
 import app
-from itertools import combinations
-from random import choice, randrange
-from typing import TYPE_CHECKING
+import pygame
+from array import array
+from collections import deque
+from typing import TYPE_CHECKING, Optional
 from utilities.direction import Direction
 
 if TYPE_CHECKING:
     from app.states.game import Game
+    from app.themes.sprite import SingleDirectionAnimatedSprite
 
 
 class InvalidMazeLayoutError(ValueError):
@@ -17,198 +19,231 @@ class InvalidMazeLayoutError(ValueError):
         super().__init__(msg)
 
 
-class MazeCell:
-    CELL_WIDTH = 192
-    CELL_HEIGHT = 96
-
-    def __init__(self, maze: Maze, **kwargs):
-        # Reference to maze with this cell
-        self.maze = maze
-
-        # Get properties
-        self.is_wall = kwargs.get('is_wall', False)
-        self.has_dot = kwargs.get('has_dot', False)
-        self.has_energizer = kwargs.get('has_energizer', False)
-        self.is_ghost_box = kwargs.get('is_ghost_box', False)
-        self.is_ghost_box_exit = kwargs.get('is_ghost_box_exit', False)
-        self.is_pacman_spawnpoint = kwargs.get('is_pacman_spawnpoint', False)
-        self.is_blinky_scatter_goal = kwargs.get('is_blinky_scatter_goal', False)
-        self.is_pinky_scatter_goal = kwargs.get('is_pinky_scatter_goal', False)
-        self.is_inky_scatter_goal = kwargs.get('is_inky_scatter_goal', False)
-        self.is_clyde_scatter_goal = kwargs.get('is_clyde_scatter_goal', False)
-        self.has_fruit = kwargs.get('has_fruit', False)
-
-        # Set other properties to default values
-        self.turnable = False
-        self.can_go_N = False
-        self.can_go_E = False
-        self.can_go_W = False
-        self.can_go_S = False
-
-        # Validate properties
-        self._validate()
+class CellFlag:
+    """ Bits of the number describing maze cell. First eleven 
+    bits come from level files, the rest are calculated when 
+    maze is validated
+    """
+    WALL = 1 << 0
+    DOT = 1 << 1
+    ENERGIZER = 1 << 2
+    GHOST_BOX = 1 << 3
+    GHOST_BOX_EXIT = 1 << 4
+    PACMAN_SPAWNPOINT = 1 << 5
+    BLINKY_SCATTER_GOAL = 1 << 6
+    PINKY_SCATTER_GOAL = 1 << 7
+    INKY_SCATTER_GOAL = 1 << 8
+    CLYDE_SCATTER_GOAL = 1 << 9
+    FRUIT = 1 << 10
+    CAN_GO_N = 1 << 11
+    CAN_GO_E = 1 << 12
+    CAN_GO_S = 1 << 13
+    CAN_GO_W = 1 << 14
+    TURNABLE = 1 << 15
+
+    LAYOUT = (1 << 11) - 1
+    COLLECTIBLE = DOT | ENERGIZER | FRUIT
+
+    # Cell can't have more than one of these
+    CONFLICTING = WALL | DOT | ENERGIZER | GHOST_BOX | GHOST_BOX_EXIT | PACMAN_SPAWNPOINT
+
+    CAN_GO = {
+        Direction.N: CAN_GO_N,
+        Direction.E: CAN_GO_E,
+        Direction.S: CAN_GO_S,
+        Direction.W: CAN_GO_W,
+    }
+
+
+class WallMask:
+    """ Bits of the mask describing which neighbors of wall 
+    cell are walls too. Cells outside the maze count as walls
+    """
+    UP = 1 << 0
+    UP_RIGHT = 1 << 1
+    RIGHT = 1 << 2
+    DOWN_RIGHT = 1 << 3
+    DOWN = 1 << 4
+    DOWN_LEFT = 1 << 5
+    LEFT = 1 << 6
+    UP_LEFT = 1 << 7
+
+    NEIGHBORS = {
+        UP: (0, -1),
+        UP_RIGHT: (1, -1),
+        RIGHT: (1, 0),
+        DOWN_RIGHT: (1, 1),
+        DOWN: (0, 1),
+        DOWN_LEFT: (-1, 1),
+        LEFT: (-1, 0),
+        UP_LEFT: (-1, -1),
+    }
+
+    # Wall slice in the corner is drawn only if 
+    # all three neighbors around the corner are walls 
+    NW = UP | LEFT | UP_LEFT
+    NE = UP | RIGHT | UP_RIGHT
+    SW = DOWN | LEFT | DOWN_LEFT
+    SE = DOWN | RIGHT | DOWN_RIGHT
 
-        # Get sprites
-        theme = self.maze.game.app.theme
-        self.floor_sprite = choice(theme.floor)
-        self.floor_frame_idx = randrange(0, self.floor_sprite.amount)
 
-        if self.is_wall:
-            self.wall_sprite = choice(theme.wall)
-            self.wall_sprite_idx = randrange(0, self.wall_sprite.amount)
+class MazeCell:
+    """ Lightweight view of the cell stored in maze arrays. 
+    Views are created on demand and hold no state of their own
+    """
 
-        if self.has_dot:
-            self.dot_sprite = choice(theme.dot)
-            self.dot_frame_idx = randrange(0, self.dot_sprite.amount)
+    CELL_WIDTH = 192
+    CELL_HEIGHT = 96
 
-        if self.has_energizer:
-            self.energizer_sprite = choice(theme.energizer)
-            self.energizer_frame_idx = randrange(0, self.energizer_sprite.amount)
+    __slots__ = ('maze', 'idx')
 
-        if self.is_ghost_box_exit:
-            self.ghost_box_exit = choice(theme.ghost_box_exit)
-            self.ghost_box_frame_idx = randrange(0, self.ghost_box_exit.amount)
+    def __init__(self, maze: Maze, idx: int):
+        self.maze = maze
+        self.idx = idx
+
+    def _flag(flag: int) -> property:
+        def getter(self: MazeCell) -> bool:
+            return bool(self.maze.cells[self.idx] & flag)
+
+        def setter(self: MazeCell, value: bool):
+            if value:
+                self.maze.cells[self.idx] |= flag
+            else:
+                self.maze.cells[self.idx] &= ~flag
+
+        return property(getter, setter)
+
+    def _collectible(kind: int) -> property:
+        def getter(self: MazeCell) -> bool:
+            return self.maze.collectibles.has(self.idx, kind)
+
+        return property(getter)
+
+    def _sprite(kind: str) -> property:
+        def getter(self: MazeCell):
+            return self.maze.get_sprite(kind, self.idx)
+
+        return property(getter)
+
+    def _phase(kind: str) -> property:
+        def getter(self: MazeCell) -> int:
+            return self.maze.phases[kind][self.idx]
+
+        return property(getter)
+
+    is_wall = _flag(CellFlag.WALL)
+    has_dot = _collectible(CellFlag.DOT)
+    has_energizer = _collectible(CellFlag.ENERGIZER)
+    is_ghost_box = _flag(CellFlag.GHOST_BOX)
+    is_ghost_box_exit = _flag(CellFlag.GHOST_BOX_EXIT)
+    is_pacman_spawnpoint = _flag(CellFlag.PACMAN_SPAWNPOINT)
+    is_blinky_scatter_goal = _flag(CellFlag.BLINKY_SCATTER_GOAL)
+    is_pinky_scatter_goal = _flag(CellFlag.PINKY_SCATTER_GOAL)
+    is_inky_scatter_goal = _flag(CellFlag.INKY_SCATTER_GOAL)
+    is_clyde_scatter_goal = _flag(CellFlag.CLYDE_SCATTER_GOAL)
+    has_fruit = _collectible(CellFlag.FRUIT)
+    can_go_N = _flag(CellFlag.CAN_GO_N)
+    can_go_E = _flag(CellFlag.CAN_GO_E)
+    can_go_S = _flag(CellFlag.CAN_GO_S)
+    can_go_W = _flag(CellFlag.CAN_GO_W)
+    turnable = _flag(CellFlag.TURNABLE)
+
+    floor_sprite = _sprite('floor')
+    wall_sprite = _sprite('wall')
+    dot_sprite = _sprite('dot')
+    energizer_sprite = _sprite('energizer')
+    ghost_box_exit_sprite = _sprite('ghost_box_exit')
+    fruit_sprite = _sprite('fruit')
+
+    floor_phase = _phase('floor')
+    wall_phase = _phase('wall')
+    dot_phase = _phase('dot')
+    energizer_phase = _phase('energizer')
+    ghost_box_exit_phase = _phase('ghost_box_exit')
+    fruit_phase = _phase('fruit')
+
+    del _flag, _collectible, _sprite, _phase
 
-        if self.has_fruit:
-            self.fruit_sprite = choice(theme.fruit)
-            self.fruit_frame_idx = randrange(self.fruit_sprite.amount)
+    @property
+    def wall_mask(self) -> int:
+        return self.maze.wall_masks[self.idx]
     
     def can_turn(self, direction: int) -> bool:
-        if direction == Direction.N:
-            return self.can_go_N
-        if direction == Direction.E:
-            return self.can_go_E
-        if direction == Direction.W:
-            return self.can_go_W
-        if direction == Direction.S:
-            return self.can_go_S
-        raise ValueError(f'Invalid direction: {direction}')
+        if direction not in CellFlag.CAN_GO:
+            raise ValueError(f'Invalid direction: {direction}')
+        return bool(self.maze.cells[self.idx] & CellFlag.CAN_GO[direction])
 
     @property
     def has_collectible(self):
-        return self.has_dot or self.has_energizer or self.has_fruit
-
-    # Creating and validating cell
-    @classmethod
-    def from_number(self, maze: Maze, n: int) -> MazeCell:
-        return MazeCell(
-            maze = maze,
-            is_wall = bool(n & (1 << 0)),
-            has_dot = bool(n & (1 << 1)),
-            has_energizer = bool(n & (1 << 2)),
-            is_ghost_box = bool(n & (1 << 3)),
-            is_ghost_box_exit = bool(n & (1 << 4)),
-            is_pacman_spawnpoint = bool(n & (1 << 5)),
-            is_blinky_scatter_goal = bool(n & (1 << 6)),
-            is_pinky_scatter_goal = bool(n & (1 << 7)),
-            is_inky_scatter_goal = bool(n & (1 << 8)),
-            is_clyde_scatter_goal = bool(n & (1 << 9)),
-            has_fruit = bool(n & (1 << 10))
-        )
-
-    def _validate(self):
-        """ Checks if this cell has any conflicting
-        properties
-
-        Raises:
-            ValueError: conflicting properties exist
-        """     
-           
-        attributes = [
-            self.is_wall,
-            self.has_dot,
-            self.has_energizer,
-            self.is_ghost_box,
-            self.is_ghost_box_exit,
-            self.is_pacman_spawnpoint,
-        ]
-
-        if any(a and b for a, b in combinations(attributes, r=2)):
-            raise InvalidMazeLayoutError('Invalid maze cell')
+        return self.maze.collectibles.has(self.idx)
 
     # Displaying cell on screen
-    def draw(self, mz_coords: tuple[int, int], screen_coords: tuple[int, int]):
-        """ Displays cell to screen in specified coordinates
+    def static_blits(self, screen_coords: tuple[float, float], 
+                     frame_shift: int = 0) -> list[tuple[pygame.Surface, pygame.Rect]]:
+        """ Returns floor and walls of the cell as (frame, position) pairs,
+        so callers can draw many cells with a single Surface.blits call.
+        This part of the cell never changes, so it's baked into static layer
 
         Args:
-            mz_coords (tuple[int, int]): Coordinates of the cell in maze grid
-            screen_coords (tuple[int, int]): Coordinates of the cell center on screen surface
-        """        
-        game_frames_per_sprite_frame = self.maze.game.app.FPS // self.maze.game.app.ANIMATION_FPS
-
-        screen = self.maze.game.app.screen
-        mz_x, mz_y = mz_coords
+            screen_coords (tuple[float, float]): Coordinates of the cell center on surface
+            frame_shift (int): Amount of sprite frames passed since game started
+        """
         sc_x, sc_y = screen_coords
         
-        # Display floor 
-        floor_frame = self.floor_sprite.frame(self.floor_frame_idx // game_frames_per_sprite_frame)
-        self.floor_frame_idx = (self.floor_frame_idx + 1) % (self.floor_sprite.amount * game_frames_per_sprite_frame)
-        pos = floor_frame.get_rect(center=screen_coords)
-        screen.blit(floor_frame, pos)
+        # Floor 
+        floor_frame = self.floor_sprite.frame((self.floor_phase + frame_shift) % self.floor_sprite.amount)
+        blits = [(floor_frame, floor_frame.get_rect(center=screen_coords))]
 
-        # Display wall according to surroundings
+        # Wall according to surroundings
         if self.is_wall:
-            # Check each corner if it needs wall
-            w, h = self.maze.width_in_cells, self.maze.height_in_cells
-
-            nw = (mz_y <= 0 or self.maze.grid[mz_y - 1][mz_x].is_wall) and \
-                 (mz_x <= 0 or self.maze.grid[mz_y][mz_x - 1].is_wall) and \
-                 (mz_x <= 0 or mz_y <= 0 or self.maze.grid[mz_y - 1][mz_x - 1].is_wall)
-
-            sw = (mz_y >= h - 1 or self.maze.grid[mz_y + 1][mz_x].is_wall) and \
-                 (mz_x <= 0 or self.maze.grid[mz_y][mz_x - 1].is_wall) and \
-                 (mz_x <= 0 or mz_y >= h - 1 or self.maze.grid[mz_y + 1][mz_x - 1].is_wall)
-
-            se = (mz_y >= h - 1 or self.maze.grid[mz_y + 1][mz_x].is_wall) and \
-                 (mz_x >= w - 1 or self.maze.grid[mz_y][mz_x + 1].is_wall) and \
-                 (mz_x >= w - 1 or mz_y >= h - 1 or self.maze.grid[mz_y + 1][mz_x + 1].is_wall)
-
-            ne = (mz_y <= 0 or self.maze.grid[mz_y - 1][mz_x].is_wall) and \
-                 (mz_x >= w - 1 or self.maze.grid[mz_y][mz_x + 1].is_wall) and \
-                 (mz_x >= w - 1 or mz_y <= 0 or self.maze.grid[mz_y - 1][mz_x + 1].is_wall)
-
-            # Draw walls in order
-            wall_frame = self.wall_sprite.frame(self.wall_sprite_idx // game_frames_per_sprite_frame)
-            self.wall_sprite_idx = (self.wall_sprite_idx + 1) % (self.wall_sprite.amount * game_frames_per_sprite_frame)
-            if nw:
-                pos = wall_frame.get_rect(midbottom=(sc_x, sc_y))
-                screen.blit(wall_frame, pos)
-            if ne:
-                pos = wall_frame.get_rect(midbottom=(sc_x + MazeCell.CELL_WIDTH/4, 
-                                                     sc_y + MazeCell.CELL_HEIGHT/4))
-                screen.blit(wall_frame, pos)
-            if sw:
-                pos = wall_frame.get_rect(midbottom=(sc_x - MazeCell.CELL_WIDTH/4, 
-                                                     sc_y + MazeCell.CELL_HEIGHT/4))
-                screen.blit(wall_frame, pos)
-            if se:
-                pos = wall_frame.get_rect(midbottom=(sc_x, 
-                                                     sc_y + MazeCell.CELL_HEIGHT/2))
-                screen.blit(wall_frame, pos)
-
-        # Display dot
-        if self.has_dot:
-            dot_frame = self.dot_sprite.frame(self.dot_frame_idx // game_frames_per_sprite_frame)
-            self.dot_frame_idx = (self.dot_frame_idx + 1) % (self.dot_sprite.amount * game_frames_per_sprite_frame)
-            pos = dot_frame.get_rect(center=screen_coords)
-            screen.blit(dot_frame, pos)
-            
-        # Display energizer
-        if self.has_energizer:
-            energizer_frame = self.energizer_sprite.frame(self.energizer_frame_idx // game_frames_per_sprite_frame)
-            self.energizer_frame_idx = (self.energizer_frame_idx + 1) % (self.energizer_sprite.amount * game_frames_per_sprite_frame)
-            pos = energizer_frame.get_rect(center=screen_coords)
-            screen.blit(energizer_frame, pos)
-
-        if self.has_fruit:
-            fruit_frame = self.fruit_sprite.frame(self.fruit_frame_idx // game_frames_per_sprite_frame)
-            self.fruit_frame_idx = (self.fruit_frame_idx + 1) % (self.fruit_sprite.amount * game_frames_per_sprite_frame)
-            pos = fruit_frame.get_rect(center=screen_coords)
-            screen.blit(fruit_frame, pos)
+            wall_frame_idx = (self.wall_phase + frame_shift) % self.wall_sprite.amount
+            wall_surface = self.maze.get_wall_surface(self.wall_sprite, wall_frame_idx, self.wall_mask)
+            if wall_surface is not None:
+                pos = wall_surface.get_rect(midbottom=(sc_x, sc_y + MazeCell.CELL_HEIGHT/2))
+                blits.append((wall_surface, pos))
+
+        return blits
+
+    def collectible_blits(self, screen_coords: tuple[float, float], frame_shift: int = 0, 
+                          animated: bool = False) -> list[tuple[pygame.Surface, pygame.Rect]]:
+        """ Returns collectibles of the cell as (frame, position) pairs. Ones
+        with single frame sprites are baked into static layer, which is patched
+        once they are eaten. Animated ones are drawn every frame
+
+        Args:
+            screen_coords (tuple[float, float]): Coordinates of the cell center on surface
+            frame_shift (int): Amount of sprite frames passed since game started
+            animated (bool): If True, only collectibles with animated sprites are
+            returned, otherwise only ones with single frame sprites. Defaults to False.
+        """
+
+        blits = []
+        for has, sprite, phase in ((self.has_dot, self.dot_sprite, self.dot_phase),
+                                   (self.has_energizer, self.energizer_sprite, self.energizer_phase),
+                                   (self.has_fruit, self.fruit_sprite, self.fruit_phase)):
+            if has and (sprite.amount > 1) == animated:
+                frame = sprite.frame((phase + frame_shift) % sprite.amount)
+                blits.append((frame, frame.get_rect(center=screen_coords)))
+
+        return blits
 
 
 class Maze:
     LEVEL_PATH = 'levels'
+    USE_NAVIGATION_TABLE = True
+
+    # Levels that were already read from files, by file name
+    _loaded_levels: dict[str, list[list[int]]] = {}
+
+    # Sprites of maze cells and flags of cells that need them
+    SPRITE_KINDS = {
+        'floor': None,
+        'wall': CellFlag.WALL,
+        'dot': CellFlag.DOT,
+        'energizer': CellFlag.ENERGIZER,
+        'ghost_box_exit': CellFlag.GHOST_BOX_EXIT,
+        'fruit': CellFlag.FRUIT,
+    }
 
     def __init__(self, game: Game, grid_nums: list[list[int]]):
         """ Creates maze from grid of numbers
@@ -220,13 +255,128 @@ class Maze:
         """
 
         self.game = game
-        self.grid = [[MazeCell.from_number(self, n) for n in line] 
-                    for line in grid_nums]
-        self.collectibles_amount = 0
+        self._height = len(grid_nums)
+        self._width = len(grid_nums[0]) if grid_nums else 0
+        if any(len(line) != self._width for line in grid_nums):
+            raise InvalidMazeLayoutError('Lines of maze have different length')
+
+        # Cells are stored row by row in flat array
+        self.cells = array('H', (n & CellFlag.LAYOUT for line in grid_nums for n in line))
+        self.wall_masks = bytearray(len(self.cells))
+        self._wall_surfaces = {}
 
         self._validate()
 
+        # Collectibles change during the game, so they are kept in their own
+        # store instead of flags of cells. Imported here, like modules below
+        from app.states.game.collectibles import Collectibles
+        self.collectibles = Collectibles(self.cells)
+        for idx, n in enumerate(self.cells):
+            self.cells[idx] = n & ~CellFlag.COLLECTIBLE
+
+        self._find_nearest_walkable()
+        self._choose_sprites()
+
+        # Imported here, because these modules depend on maze module
+        from app.states.game.flow_field import FlowField
+        from app.states.game.navigation import NavigationTable
+        self.navigation = NavigationTable.for_maze(self) if Maze.USE_NAVIGATION_TABLE else None
+        self.pacman_flow_field = FlowField(self)
+
+    def index(self, mz_coords: tuple[int, int]) -> int:
+        """ Position of the cell in maze arrays """
+        return mz_coords[1] * self._width + mz_coords[0]
+
+    def contains(self, mz_coords: tuple[int, int]) -> bool:
+        return 0 <= mz_coords[0] < self._width and 0 <= mz_coords[1] < self._height
+
+    def cell(self, mz_coords: tuple[int, int]) -> MazeCell:
+        if not self.contains(mz_coords):
+            raise IndexError(f'Cell {mz_coords} is outside the maze')
+        return MazeCell(self, self.index(mz_coords))
+
+    def is_wall(self, mz_coords: tuple[int, int]) -> bool:
+        """ Checks if there's wall in given cell. 
+        Everything outside the maze counts as wall
+        """
+        return not self.contains(mz_coords) or \
+               bool(self.cells[self.index(mz_coords)] & CellFlag.WALL)
+
+    def _choose_sprites(self):
+        """ Picks random variation and animation phase 
+        of every sprite that maze cells need 
+        """
+
+        theme = self.game.app.theme
+        rng = self.game.rng
+        size = len(self.cells)
+        self.sprite_variations = {}
+        self.phases = {}
+        for kind, flag in Maze.SPRITE_KINDS.items():
+            sprites = getattr(theme, kind)
+            variations = bytearray(size)
+            phases = array('H', bytes(2 * size))
+            for idx, n in enumerate(self.cells):
+                if flag is None or (n | self.collectibles.flags[idx]) & flag:
+                    variation = rng.randrange(0, len(sprites))
+                    variations[idx] = variation
+                    phases[idx] = rng.randrange(0, sprites[variation].amount)
+
+            self.sprite_variations[kind] = variations
+            self.phases[kind] = phases
+
+    def _find_nearest_walkable(self):
+        """ Finds the closest walkable cell for every cell of the maze.
+        Search starts from all walkable cells at once and goes through 
+        walls, so distances are the same as Manhattan distances 
+        """
+
+        w, h = self._width, self._height
+        self._nearest_walkable = array('i', [-1]) * len(self.cells)
+
+        q = deque()
+        for idx, n in enumerate(self.cells):
+            if not n & CellFlag.WALL:
+                self._nearest_walkable[idx] = idx
+                q.append(idx)
+
+        while q:
+            u = q.popleft()
+            u_y, u_x = divmod(u, w)
+            for v_x, v_y in ((u_x, u_y + 1), (u_x + 1, u_y), (u_x, u_y - 1), (u_x - 1, u_y)):
+                if 0 <= v_x < w and 0 <= v_y < h and self._nearest_walkable[v_y * w + v_x] == -1:
+                    self._nearest_walkable[v_y * w + v_x] = self._nearest_walkable[u]
+                    q.append(v_y * w + v_x)
+
+    def nearest_walkable(self, mz_coords: tuple[int, int]) -> Optional[tuple[int, int]]:
+        """ Returns the closest by Manhattan distance walkable cell 
+        to given cell, which can also be outside the maze. Returns 
+        None if there are no walkable cells at all
+        """
+
+        # For a point outside the maze, the closest cell is the
+        # same as for the point on the border right next to it
+        x = min(max(mz_coords[0], 0), self._width - 1)
+        y = min(max(mz_coords[1], 0), self._height - 1)
+
+        nearest = self._nearest_walkable[y * self._width + x]
+        if nearest == -1:
+            return None
+        return nearest % self._width, nearest // self._width
+
+    def get_sprite(self, kind: str, idx: int):
+        return getattr(self.game.app.theme, kind)[self.sprite_variations[kind][idx]]
+
     def _validate(self):
+        w, h = self._width, self._height
+        cells = self.cells
+
+        # Make sure no cell has conflicting properties
+        for n in cells:
+            conflicting = n & CellFlag.CONFLICTING
+            if conflicting & (conflicting - 1):
+                raise InvalidMazeLayoutError('Invalid maze cell')
+
         # Get pacman and ghost spawnpoints and make sure 
         # there is at least one of them for each character
         self._pacman_spawnpoints = []
@@ -239,46 +389,47 @@ class Maze:
         self.pinky_scatter_goal = None
         self.inky_scatter_goal = None
         self.clyde_scatter_goal = None
-        for i, line in enumerate(self.grid):
-            for j, cell in enumerate(line):
-                if cell.is_pacman_spawnpoint:
-                    self._pacman_spawnpoints.append((j, i))
-
-                if cell.is_ghost_box_exit:
-                    self._blinky_spawnpoints.append((j, i))
-
-                if cell.is_ghost_box:
-                    if ghost_box_counter == 0:
-                        self._pinky_spawnpoints.append((j, i))
-                    if ghost_box_counter == 1:
-                        self._inky_spawnpoints.append((j, i))
-                    if ghost_box_counter == 2:
-                        self._clyde_spawnpoints.append((j, i))
-                    ghost_box_counter = (ghost_box_counter + 1) % 3
-
-                if cell.is_blinky_scatter_goal:
-                    if self.blinky_scatter_goal is None:
-                        self.blinky_scatter_goal = (j, i)
-                    else:
-                        raise InvalidMazeLayoutError(f'Multiple Blinky scatter goals found: at {self.blinky_scatter_goal} and {(j, i)}')
-
-                if cell.is_pinky_scatter_goal:
-                    if self.pinky_scatter_goal is None:
-                        self.pinky_scatter_goal = (j, i)
-                    else:
-                        raise InvalidMazeLayoutError(f'Multiple Pinky scatter goals found: at {self.pinky_scatter_goal} and {(j, i)}')
-
-                if cell.is_inky_scatter_goal:
-                    if self.inky_scatter_goal is None:
-                        self.inky_scatter_goal = (j, i)
-                    else:
-                        raise InvalidMazeLayoutError(f'Multiple Inky scatter goals found: at {self.inky_scatter_goal} and {(j, i)}')
-
-                if cell.is_clyde_scatter_goal:
-                    if self.clyde_scatter_goal is None:
-                        self.clyde_scatter_goal = (j, i)
-                    else:
-                        raise InvalidMazeLayoutError(f'Multiple Clyde scatter goals found: at {self.clyde_scatter_goal} and {(j, i)}')
+        for idx, n in enumerate(cells):
+            i, j = divmod(idx, w)
+
+            if n & CellFlag.PACMAN_SPAWNPOINT:
+                self._pacman_spawnpoints.append((j, i))
+
+            if n & CellFlag.GHOST_BOX_EXIT:
+                self._blinky_spawnpoints.append((j, i))
+
+            if n & CellFlag.GHOST_BOX:
+                if ghost_box_counter == 0:
+                    self._pinky_spawnpoints.append((j, i))
+                if ghost_box_counter == 1:
+                    self._inky_spawnpoints.append((j, i))
+                if ghost_box_counter == 2:
+                    self._clyde_spawnpoints.append((j, i))
+                ghost_box_counter = (ghost_box_counter + 1) % 3
+
+            if n & CellFlag.BLINKY_SCATTER_GOAL:
+                if self.blinky_scatter_goal is None:
+                    self.blinky_scatter_goal = (j, i)
+                else:
+                    raise InvalidMazeLayoutError(f'Multiple Blinky scatter goals found: at {self.blinky_scatter_goal} and {(j, i)}')
+
+            if n & CellFlag.PINKY_SCATTER_GOAL:
+                if self.pinky_scatter_goal is None:
+                    self.pinky_scatter_goal = (j, i)
+                else:
+                    raise InvalidMazeLayoutError(f'Multiple Pinky scatter goals found: at {self.pinky_scatter_goal} and {(j, i)}')
+
+            if n & CellFlag.INKY_SCATTER_GOAL:
+                if self.inky_scatter_goal is None:
+                    self.inky_scatter_goal = (j, i)
+                else:
+                    raise InvalidMazeLayoutError(f'Multiple Inky scatter goals found: at {self.inky_scatter_goal} and {(j, i)}')
+
+            if n & CellFlag.CLYDE_SCATTER_GOAL:
+                if self.clyde_scatter_goal is None:
+                    self.clyde_scatter_goal = (j, i)
+                else:
+                    raise InvalidMazeLayoutError(f'Multiple Clyde scatter goals found: at {self.clyde_scatter_goal} and {(j, i)}')
         
         if not self._pacman_spawnpoints:
             raise InvalidMazeLayoutError('No Pacman spawnpoint found')
@@ -299,45 +450,54 @@ class Maze:
         if self.clyde_scatter_goal is None:
             raise InvalidMazeLayoutError('No Clyde scatter goal found')
 
-        # Find all turnable cells
-        for i, line in enumerate(self.grid):
-            for j, cell in enumerate(line):
-                if not cell.is_wall:
-                    if i + 1 < len(self.grid) and not self.grid[i + 1][j].is_wall and \
-                        not (self.grid[i][j].is_ghost_box_exit and self.grid[i + 1][j].is_ghost_box):
-                        cell.can_go_S = True 
-                    if 0 <= i - 1 and not self.grid[i - 1][j].is_wall and \
-                        not (self.grid[i][j].is_ghost_box_exit and self.grid[i - 1][j].is_ghost_box):
-                        cell.can_go_N = True 
-                    if j + 1 < len(line) and not self.grid[i][j + 1].is_wall and \
-                        not (self.grid[i][j].is_ghost_box_exit and self.grid[i][j + 1].is_ghost_box):
-                        cell.can_go_W = True 
-                    if 0 <= j - 1 <= len(line) and not self.grid[i][j - 1].is_wall and \
-                        not (self.grid[i][j].is_ghost_box_exit and self.grid[i][j - 1].is_ghost_box):
-                        cell.can_go_E = True
-
-                    if cell.is_ghost_box_exit or \
-                        (cell.can_go_N and cell.can_go_E) or \
-                        (cell.can_go_E and cell.can_go_S) or \
-                        (cell.can_go_S and cell.can_go_W) or \
-                        (cell.can_go_W and cell.can_go_N):
-                        cell.turnable = True
-
-        # Count collectibles
-        for line in self.grid:
-            for cell in line:
-                if cell.has_collectible:
-                    self.collectibles_amount += 1
-                    
+        # Find all turnable cells. Ghost box exit never 
+        # leads back into the ghost box
+        def can_go(n: int, neighbor: int) -> bool:
+            return not neighbor & CellFlag.WALL and \
+                   not (n & CellFlag.GHOST_BOX_EXIT and neighbor & CellFlag.GHOST_BOX)
+
+        for idx, n in enumerate(cells):
+            if n & CellFlag.WALL:
+                continue
+
+            i, j = divmod(idx, w)
+            if i + 1 < h and can_go(n, cells[idx + w]):
+                n |= CellFlag.CAN_GO_S
+            if 0 <= i - 1 and can_go(n, cells[idx - w]):
+                n |= CellFlag.CAN_GO_N
+            if j + 1 < w and can_go(n, cells[idx + 1]):
+                n |= CellFlag.CAN_GO_W
+            if 0 <= j - 1 and can_go(n, cells[idx - 1]):
+                n |= CellFlag.CAN_GO_E
+
+            if n & CellFlag.GHOST_BOX_EXIT or \
+                (n & CellFlag.CAN_GO_N and n & CellFlag.CAN_GO_E) or \
+                (n & CellFlag.CAN_GO_E and n & CellFlag.CAN_GO_S) or \
+                (n & CellFlag.CAN_GO_S and n & CellFlag.CAN_GO_W) or \
+                (n & CellFlag.CAN_GO_W and n & CellFlag.CAN_GO_N):
+                n |= CellFlag.TURNABLE
+
+            cells[idx] = n
+
+        # Find out which neighbors of wall cells are walls too
+        for idx, n in enumerate(cells):
+            if n & CellFlag.WALL:
+                i, j = divmod(idx, w)
+                mask = 0
+                for bit, (dx, dy) in WallMask.NEIGHBORS.items():
+                    x, y = j + dx, i + dy
+                    if not (0 <= x < w and 0 <= y < h) or cells[y * w + x] & CellFlag.WALL:
+                        mask |= bit
+                self.wall_masks[idx] = mask
 
     # Readonly properties of maze 
     @property
     def width_in_cells(self):
-        return len(self.grid[0])
+        return self._width
 
     @property
     def height_in_cells(self):
-        return len(self.grid)
+        return self._height
 
     @property
     def width(self):
@@ -360,46 +520,99 @@ class Maze:
 
     @property
     def pacman_start(self):
-        return choice(self._pacman_spawnpoints)
+        return self.game.rng.choice(self._pacman_spawnpoints)
 
     @property
     def blinky_start(self):
-        return choice(self._blinky_spawnpoints)
+        return self.game.rng.choice(self._blinky_spawnpoints)
 
     @property
     def pinky_start(self):
-        return choice(self._pinky_spawnpoints)
+        return self.game.rng.choice(self._pinky_spawnpoints)
         
     @property
     def inky_start(self):
-        return choice(self._inky_spawnpoints)
+        return self.game.rng.choice(self._inky_spawnpoints)
         
     @property
     def clyde_start(self):
-        return choice(self._clyde_spawnpoints)
+        return self.game.rng.choice(self._clyde_spawnpoints)
 
     # Drawing cells to screen
-    def get_cell_center(self, mz_coords: tuple[int, int]) -> tuple[int, int]:
-        sc_x, sc_y = self.ne_corner
+    @staticmethod
+    def get_cell_offset(mz_coords: tuple[int, int]) -> tuple[float, float]:
+        """ Position of the cell center relative to the center 
+        of the cell in the north-east corner of the maze 
+        """
+
         mz_x, mz_y = mz_coords
+        return (
+            MazeCell.CELL_WIDTH/2 * (mz_x - mz_y),
+            MazeCell.CELL_HEIGHT/2 * (mz_x + mz_y)
+        )
 
-        sc_x += MazeCell.CELL_WIDTH/2 * (mz_x - mz_y)
-        sc_y += MazeCell.CELL_HEIGHT/2 * (mz_x + mz_y)
+    def get_cell_center(self, mz_coords: tuple[int, int]) -> tuple[int, int]:
+        sc_x, sc_y = self.ne_corner
+        off_x, off_y = Maze.get_cell_offset(mz_coords)
 
-        return sc_x, sc_y
+        return sc_x + off_x, sc_y + off_y
 
-    def draw_cell(self, mz_coords: tuple[int, int]) -> None:
-        """ Draws specified maze cell """
-        mz_x, mz_y = mz_coords
+    def get_wall_surface(self, sprite: SingleDirectionAnimatedSprite, 
+                         frame_idx: int, wall_mask: int) -> Optional[pygame.Surface]:
+        """ Returns wall with all slices required by wall mask composed
+        into single surface, or None if wall has no slices at all. 
+        Bottom center of returned surface matches south corner of the cell
+        """
 
-        if 0 <= mz_x < self.width_in_cells and \
-           0 <= mz_y < self.height_in_cells:
-            on_screen_coords = self.get_cell_center(mz_coords)
-            self.grid[mz_y][mz_x].draw(mz_coords, on_screen_coords)
+        corners = [(corner, wall_mask & corner == corner) for corner in 
+                   (WallMask.NW, WallMask.NE, WallMask.SW, WallMask.SE)]
+        key = id(sprite), frame_idx, tuple(present for _, present in corners)
+        if key in self._wall_surfaces:
+            return self._wall_surfaces[key]
+
+        if not any(present for _, present in corners):
+            self._wall_surfaces[key] = None
+            return None
+
+        wall_frame = sprite.frame(frame_idx)
+        w, h = wall_frame.get_size()
+        surface = pygame.Surface((w + MazeCell.CELL_WIDTH//2, h + MazeCell.CELL_HEIGHT//2), 
+                                 pygame.SRCALPHA).convert_alpha()
+        surface.fill((0, 0, 0, 0))
+
+        # Draw slices in the same order they overlap each other
+        cell_x, cell_y = surface.get_width()/2, h
+        offsets = {
+            WallMask.NW: (0, 0),
+            WallMask.NE: (MazeCell.CELL_WIDTH/4, MazeCell.CELL_HEIGHT/4),
+            WallMask.SW: (-MazeCell.CELL_WIDTH/4, MazeCell.CELL_HEIGHT/4),
+            WallMask.SE: (0, MazeCell.CELL_HEIGHT/2),
+        }
+        for corner, present in corners:
+            if present:
+                dx, dy = offsets[corner]
+                pos = wall_frame.get_rect(midbottom=(cell_x + dx, cell_y + dy))
+                surface.blit(wall_frame, pos)
+
+        self._wall_surfaces[key] = surface
+        return surface
+
+    def invalidate(self) -> None:
+        """ Drops composed wall surfaces. Should be called 
+        when theme or display mode changes
+        """
+        self._wall_surfaces.clear()
 
     # Loading existing mazes from files
     @staticmethod
     def _load_level_csv(level_name) -> list[list[int]]:
+        """ Reads level from file. Levels are read only once 
+        and then taken from cache, so returned grid must not be changed
+        """
+
+        if level_name in Maze._loaded_levels:
+            return Maze._loaded_levels[level_name]
+
         path = app.resource_path(os.path.join(Maze.LEVEL_PATH, level_name))
         if not os.path.exists(path):
             raise FileNotFoundError(f"Level file at {path} doesn't exist")
@@ -413,9 +626,25 @@ class Maze:
                 except ValueError:
                     raise ValueError(f"Found non-integer value in {path}")
 
+        Maze._loaded_levels[level_name] = grid
         return grid
 
+    @staticmethod
+    def load_levels() -> None:
+        """ Reads all level files into cache """
+
+        for level_name in sorted(os.listdir(app.resource_path(Maze.LEVEL_PATH))):
+            if level_name.endswith('.csv'):
+                Maze._load_level_csv(level_name)
+
     @classmethod
     def classic(cls, game: Game) -> Maze:
         grid = cls._load_level_csv('classic.csv')
         return Maze(game, grid)
+
+    @classmethod
+    def generated(cls, game: Game, width: int, height: int, seed: Optional[int] = None) -> Maze:
+        """ Creates random maze of given size """
+
+        from app.states.game.maze_generator import MazeGenerator
+        return Maze(game, MazeGenerator(width, height, seed).generate())
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import random
+from array import array
+from typing import Optional
+from app.states.game.maze import CellFlag
+
+
+class MazeGenerator:
+    """ Creates random layouts in the format of level files.
+    Corridors are laid on a lattice of odd cells: first as a spanning
+    tree, then dead ends are joined to their neighbors, so there are
+    loops everywhere, like in the classic maze. Ghost house is put in
+    the center, and tunnels lead through left and right borders
+    """
+
+    MIN_WIDTH = 21
+    MIN_HEIGHT = 21
+
+    # Size of the corridor ring around the ghost house, in lattice steps
+    HOUSE_WIDTH = 5
+    HOUSE_HEIGHT = 3
+
+    # Distance between tunnel rows
+    ROWS_PER_TUNNEL = 24
+
+    # One fruit per this amount of cells, but at least four of them
+    CELLS_PER_FRUIT = 2000
+
+    def __init__(self, width: int, height: int, seed: Optional[int] = None):
+        """
+        Args:
+            width (int): Width of the maze in cells
+            height (int): Height of the maze in cells
+            seed (int, optional): Same seed always gives the same layout. Defaults to None.
+        """
+
+        if width < MazeGenerator.MIN_WIDTH or height < MazeGenerator.MIN_HEIGHT:
+            raise ValueError(f'Maze must be at least {MazeGenerator.MIN_WIDTH}x{MazeGenerator.MIN_HEIGHT} cells')
+
+        self.width = width
+        self.height = height
+        self.rng = random.Random(seed)
+
+        # Corridor crossings are in cells with odd coordinates
+        self.nodes_w = (width - 1) // 2
+        self.nodes_h = (height - 1) // 2
+
+        # Ghost house and the ring around it, in lattice coordinates
+        self.house_i0 = self.nodes_w // 2 - MazeGenerator.HOUSE_WIDTH // 2
+        self.house_j0 = self.nodes_h // 2 - MazeGenerator.HOUSE_HEIGHT // 2
+        self.house_i1 = self.house_i0 + MazeGenerator.HOUSE_WIDTH
+        self.house_j1 = self.house_j0 + MazeGenerator.HOUSE_HEIGHT
+
+    def generate(self) -> list[list[int]]:
+        """ Returns new layout as a matrix of cell numbers """
+
+        self.cells = bytearray([CellFlag.WALL]) * (self.width * self.height)
+        self._carve_tree()
+        self._build_house()
+        self._braid()
+
+        cells = array('H', iter(self.cells))
+        self._place_items(cells)
+        self._place_tunnels(cells)
+
+        w = self.width
+        return [cells[y * w:(y + 1) * w].tolist() for y in range(self.height)]
+
+    def _node(self, i: int, j: int) -> int:
+        return (2 * j + 1) * self.width + 2 * i + 1
+
+    def _in_house(self, i: int, j: int) -> bool:
+        """ Checks if node is inside the corridor ring around ghost house """
+        return self.house_i0 < i < self.house_i1 and self.house_j0 < j < self.house_j1
+
+    def _carve_tree(self):
+        """ Sidewinder algorithm: every row is split into random runs,
+        each of them is joined to the row above at random place
+        """
+
+        w = self.width
+        for j in range(self.nodes_h):
+            y = 2 * j + 1
+            self.cells[y * w + 1:y * w + 2 * self.nodes_w:2] = bytes(self.nodes_w)
+
+            run_start = 0
+            for i in range(self.nodes_w):
+                last = i == self.nodes_w - 1
+                if j > 0 and (last or self.rng.random() < 0.5):
+                    k = self.rng.randint(run_start, i)
+                    self.cells[self._node(k, j) - w] = 0
+                    run_start = i + 1
+                elif not last:
+                    self.cells[self._node(i, j) + 1] = 0
+
+    def _build_house(self):
+        """ Replaces nodes of the central area with the ghost house
+        surrounded by corridor ring. Every corridor that lead into
+        this area now ends at the ring, so maze stays connected
+        """
+
+        w = self.width
+        x0, y0 = 2 * self.house_i0 + 1, 2 * self.house_j0 + 1
+        x1, y1 = 2 * self.house_i1 + 1, 2 * self.house_j1 + 1
+        for y in range(y0, y1 + 1):
+            for x in range(x0, x1 + 1):
+                on_ring = y in (y0, y1) or x in (x0, x1)
+                self.cells[y * w + x] = 0 if on_ring else CellFlag.WALL
+
+        # Exit is in the upper part of the ring, house is right
+        # below it. Its upper row is only as wide as exit, so ghosts
+        # can leave the house only through exit
+        cx = (x0 + x1) // 2
+        for x in (cx, cx + 1):
+            self.cells[y0 * w + x] = CellFlag.GHOST_BOX_EXIT
+            self.cells[(y0 + 1) * w + x] = CellFlag.GHOST_BOX
+        for x in range(cx - 1, cx + 3):
+            self.cells[(y0 + 2) * w + x] = CellFlag.GHOST_BOX
+
+        # Pacman starts below the house, like in the classic maze
+        self.pacman_spawnpoint = cx + 1, min(y1 + 4, 2 * self.nodes_h - 1)
+
+    def _braid(self):
+        """ Joins every dead end with one more neighbor,
+        preferring neighbors that are dead ends too
+        """
+
+        w = self.width
+        cells = self.cells
+        steps = ((0, -1, -w), (1, 0, 1), (0, 1, w), (-1, 0, -1))
+
+        def links(i: int, j: int) -> list[tuple[int, int, int]]:
+            """ Walls between node and its neighbors """
+            node = self._node(i, j)
+            result = []
+            for di, dj, offset in steps:
+                n_i, n_j = i + di, j + dj
+                if 0 <= n_i < self.nodes_w and 0 <= n_j < self.nodes_h and \
+                   not self._in_house(n_i, n_j):
+                    result.append((n_i, n_j, node + offset))
+            return result
+
+        def degree(i: int, j: int) -> int:
+            return sum(1 for _, _, wall in links(i, j) if cells[wall] != CellFlag.WALL)
+
+        for j in range(self.nodes_h):
+            for i in range(self.nodes_w):
+                if self._in_house(i, j) or degree(i, j) != 1:
+                    continue
+
+                closed = [(n_i, n_j, wall) for n_i, n_j, wall in links(i, j)
+                          if cells[wall] == CellFlag.WALL]
+                dead_ends = [link for link in closed if degree(link[0], link[1]) == 1]
+                _, _, wall = self.rng.choice(dead_ends or closed)
+                cells[wall] = 0
+
+    def _place_tunnels(self, cells: array):
+        """ Opens rows through left and right borders. Creature
+        going out of the maze appears on the other side of it
+        """
+
+        # One of the tunnels always goes through the middle row
+        w = self.width
+        step = MazeGenerator.ROWS_PER_TUNNEL // 2
+        for j in range(self.nodes_h // 2 % step, self.nodes_h, step):
+            # Corners are kept for scatter goals
+            if j in (0, self.nodes_h - 1):
+                continue
+
+            y = 2 * j + 1
+            cells[y * w] = 0
+            for x in range(2 * self.nodes_w, w):
+                cells[y * w + x] = 0
+
+    def _place_items(self, cells: array):
+        w = self.width
+        last_i, last_j = self.nodes_w - 1, self.nodes_h - 1
+        x0, y0 = 2 * self.house_i0 + 1, 2 * self.house_j0 + 1
+        x1, y1 = 2 * self.house_i1 + 1, 2 * self.house_j1 + 1
+
+        # Dots are everywhere except ghost house and its ring
+        for y in range(1, self.height - 1):
+            row = y * w
+            for x in range(1, w - 1):
+                if cells[row + x] == 0 and not (x0 <= x <= x1 and y0 <= y <= y1):
+                    cells[row + x] = CellFlag.DOT
+
+        x, y = self.pacman_spawnpoint
+        cells[y * w + x] = CellFlag.PACMAN_SPAWNPOINT
+
+        # Scatter goals are in the corners
+        cells[self._node(0, 0)] |= CellFlag.PINKY_SCATTER_GOAL
+        cells[self._node(last_i, 0)] |= CellFlag.BLINKY_SCATTER_GOAL
+        cells[self._node(0, last_j)] |= CellFlag.CLYDE_SCATTER_GOAL
+        cells[self._node(last_i, last_j)] |= CellFlag.INKY_SCATTER_GOAL
+
+        # Energizers are near the corners
+        for i, j in ((0, 1), (last_i, 1), (0, last_j - 1), (last_i, last_j - 1)):
+            cells[self._node(i, j)] = CellFlag.ENERGIZER
+
+        # Fruits replace random dots
+        dots = [idx for idx, n in enumerate(cells) if n == CellFlag.DOT]
+        fruits = max(4, len(cells) // MazeGenerator.CELLS_PER_FRUIT)
+        for idx in self.rng.sample(dots, min(fruits, len(dots))):
+            cells[idx] = CellFlag.FRUIT
+
+    @staticmethod
+    def write_csv(grid: list[list[int]], path: str):
+        with open(path, 'w') as f:
+            for row in grid:
+                f.write(','.join(map(str, row)) + '\n')
@@ -1,8 +1,7 @@
 from __future__ import annotations
 
+import pygame
 from abc import ABC, abstractmethod
-from math import isclose
-from random import randrange
 from typing import TYPE_CHECKING, Union
 from utilities.direction import *
 from app.states.game.maze import MazeCell
@@ -12,48 +11,8 @@ if TYPE_CHECKING:
     from app.themes.sprite import FourDirectionAnimatedSprite
 
 
-class Line:
-    """ Represents line on surface """    
-    EPS = 1e-6
-
-    def __init__(self, p1: tuple[float, float], p2: tuple[float, float]):
-        x1, y1 = p1
-        x2, y2 = p2
-
-        # y = k * x + b
-        self.k = (y2 - y1) / (x2 - x1)
-        self.b = y1 - self.k * x1
-
-    def get_ordinate(self, x: float):
-        return self.k * x + self.b
-
-    def is_parallel_to(self, other: Line):
-        return isclose(self.k, other.k, abs_tol=Line.EPS)
-
-    def get_intersection_point(self, other: Line):
-        if self.is_parallel_to(other):
-            return None
-
-        x = (other.b - self.b) / (self.k - other.k)
-        y = self.get_ordinate(x)
-        return x, y
-
-    def __eq__(self, other: Line):
-        return isclose(self.k, other.k, abs_tol=Line.EPS) and isclose(self.b, other.b, abs_tol=Line.EPS)
-
-    def __str__(self):
-        base = f"<Line: y = {self.k}x" 
-        
-        if self.b == 0:
-            return base + ">"
-        elif self.b > 0:
-            return base + f" + {self.b}>"
-        else:
-            return base + f" - {-self.b}>"
-
 class MovingCreature(ABC):
     SPRITE_WIDTH = 108
-    BOTTOM_LINE_HEIGHT = 54
 
     def __init__(self, game: Game, sprite: FourDirectionAnimatedSprite, 
                  start_cell: tuple[int, int], seconds_for_cell: float):
@@ -69,13 +28,21 @@ class MovingCreature(ABC):
         self.game = game
 
         self.sprite = sprite
-        self.frame_idx = randrange(0, self.sprite.amount)
+        self.frame_phase = self.game.rng.randrange(0, self.sprite.amount)
         self.direction = Direction.W
 
         self.cell = start_cell
-        self.sc_coords = self.game.maze.get_cell_center(self.cell)
 
-        self.frames_per_cell = self.game.app.FPS * seconds_for_cell
+        # Position relative to the north-east corner of the maze after 
+        # the last two updates. Creature is drawn between them
+        self.position = self.game.maze.get_cell_offset(self.cell)
+        self.prev_position = self.position
+
+        # Position in maze coordinates, where cells are 1 apart.
+        # Game logic uses it instead of pixel positions
+        self.mz_position = self.cell
+
+        self.frames_per_cell = self.game.app.TICK_RATE * seconds_for_cell
         self.movement_frame = 0
         self.move_direction = None
         self.goal = get_neighbor(self.cell, self.move_direction)
@@ -85,70 +52,51 @@ class MovingCreature(ABC):
     def get_direction(self) -> Union[int, None]:
         pass
 
-    def bottom_line(self) -> tuple[tuple[float, float], tuple[float, float]]:
-        if self.direction in [Direction.E, Direction.W]:
-            p1 = (
-                self.sc_coords[0] - MovingCreature.SPRITE_WIDTH/2,
-                self.sc_coords[1] - MovingCreature.BOTTOM_LINE_HEIGHT/2
-            )
-            p2 = (
-                self.sc_coords[0] + MovingCreature.SPRITE_WIDTH/2,
-                self.sc_coords[1] + MovingCreature.BOTTOM_LINE_HEIGHT/2
-            )
-        else:
-            p1 = (
-                self.sc_coords[0] - MovingCreature.SPRITE_WIDTH/2,
-                self.sc_coords[1] + MovingCreature.BOTTOM_LINE_HEIGHT/2
-            )
-            p2 = (
-                self.sc_coords[0] + MovingCreature.SPRITE_WIDTH/2,
-                self.sc_coords[1] - MovingCreature.BOTTOM_LINE_HEIGHT/2
-            )
-        return p1, p2
+    @property
+    def interpolated_position(self) -> tuple[float, float]:
+        """ Position between the last two updates, at the point 
+        where real time currently is 
+        """
 
+        alpha = self.game.interpolation
+        (prev_x, prev_y), (x, y) = self.prev_position, self.position
 
-    def check_collision(self, other: MovingCreature) -> bool:
-        self_1, self_2 = self.bottom_line()
-        other_1, other_2 = other.bottom_line()
-        
-        self_min_x = min(self_1[0], self_2[0])
-        self_max_x = max(self_1[0], self_2[0])
-        other_min_x = min(other_1[0], other_2[0])
-        other_max_x = max(other_1[0], other_2[0])
-
-        self_line = Line(self_1, self_2)
-        other_line =  Line(other_1, other_2)
-
-        # If lines are parallel, check if they have common segment
-        if self_line.is_parallel_to(other_line):
-            return self_line == other_line and (
-                self_min_x <= other_min_x <= self_max_x or \
-                self_min_x <= other_max_x <= self_max_x
-            )
-        
-        # Otherwise, check if intersection point belongs to both of lines
-        intersection = self_line.get_intersection_point(other_line)
-        return self_min_x <= intersection[0] <= self_max_x and \
-               other_min_x <= intersection[0] <= other_max_x
+        # Creature that went through the tunnel should appear
+        # on the other side instead of flying across the maze
+        if abs(x - prev_x) > MazeCell.CELL_WIDTH or abs(y - prev_y) > MazeCell.CELL_HEIGHT:
+            return self.position
 
+        return prev_x + (x - prev_x) * alpha, prev_y + (y - prev_y) * alpha
 
-    def draw(self):
-        game_frames_per_sprite_frame = self.game.app.FPS // self.game.app.ANIMATION_FPS
+    @property
+    def sc_coords(self) -> tuple[float, float]:
+        ne_x, ne_y = self.game.maze.ne_corner
+        pos_x, pos_y = self.interpolated_position
+        return ne_x + pos_x, ne_y + pos_y
+
+    def current_frame(self) -> pygame.Surface:
+        frame_idx = self.game.animation.frame_idx(self.sprite, self.frame_phase)
+        return self.sprite.frame(frame_idx, self.direction)
 
-        frame = self.sprite.frame(self.frame_idx // game_frames_per_sprite_frame, self.direction)
-        self.frame_idx = (self.frame_idx + 1) % (self.sprite.amount * game_frames_per_sprite_frame)
+    def screen_rect(self) -> pygame.Rect:
+        """ Part of the screen creature is drawn to """
+        return self.current_frame().get_rect(midbottom=self.sc_coords)
 
+    def draw(self):
+        frame = self.current_frame()
         pos = frame.get_rect(midbottom=self.sc_coords)
         self.game.app.screen.blit(frame, pos)
         
     def move(self):
+        self.prev_position = self.position
+
         if self.movement_frame == 0:
             self.cell = (
                 self.goal[0] % self.game.maze.width_in_cells,
                 self.goal[1] % self.game.maze.height_in_cells
             )
 
-            if self.game.maze.grid[self.cell[1]][self.cell[0]].turnable or self.move_direction is None:
+            if self.game.maze.cell(self.cell).turnable or self.move_direction is None:
                 self.move_direction = self.get_direction()
                 if self.move_direction is not None:
                     self.direction = self.move_direction
@@ -161,8 +109,11 @@ class MovingCreature(ABC):
             self.goal[1] - self.cell[1]
         )
         
-        cell_coords = self.game.maze.get_cell_center(self.cell)
-        self.sc_coords = (
+        progress = self.movement_frame / self.frames_per_cell
+        self.mz_position = self.cell[0] + d[0] * progress, self.cell[1] + d[1] * progress
+
+        cell_coords = self.game.maze.get_cell_offset(self.cell)
+        self.position = (
             cell_coords[0] + MazeCell.CELL_WIDTH/2 * (d[0] - d[1]) * self.movement_frame / self.frames_per_cell,
             cell_coords[1] + MazeCell.CELL_HEIGHT/2 * (d[0] + d[1]) * self.movement_frame / self.frames_per_cell
         )
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import app
+import hashlib
+import os
+from array import array
+from collections import deque
+from typing import TYPE_CHECKING, Optional, Union
+from app.states.game.maze import CellFlag
+from utilities.direction import Direction
+
+if TYPE_CHECKING:
+    from app.states.game.maze import Maze
+
+
+class NavigationTable:
+    """ Distances and first steps of shortest paths between every
+    pair of walkable cells of the maze. Table is built once per
+    layout and cached on disk, so ghosts can find their way in O(1)
+    """
+
+    CACHE_PATH = 'cache'
+    FILE_SIGNATURE = b'PMNAV1'
+
+    # Table takes 3 * MAX_CELLS^2 bytes, bigger mazes use regular search
+    MAX_CELLS = 1024
+
+    UNREACHABLE = 0xFFFF
+    NO_DIRECTION = 0xFF
+
+    # Same order as the order in which ghosts search for path
+    STEPS = [
+        ((0, 1), Direction.S),
+        ((1, 0), Direction.W),
+        ((0, -1), Direction.N),
+        ((-1, 0), Direction.E)
+    ]
+
+    # Tables that were already loaded, by layout hash
+    _loaded: dict[str, NavigationTable] = {}
+
+    def __init__(self, width: int, nodes: array, size: int, 
+                 distances: array, directions: bytearray):
+        """ Creates table from packed arrays
+
+        Args:
+            width (int): Width of the maze in cells
+            nodes (array): Index of walkable cell in the table for
+            each maze cell, or -1 for walls
+            size (int): Amount of walkable cells
+            distances (array): Flat matrix of distances between walkable cells
+            directions (bytearray): Flat matrix of first steps between walkable cells
+        """
+
+        self.width = width
+        self.height = len(nodes) // width
+        self.nodes = nodes
+        self.size = size
+        self.distances = distances
+        self.directions = directions
+
+    @staticmethod
+    def layout_hash(maze: Maze) -> str:
+        """ Hash of the part of maze layout that affects navigation """
+
+        walls = bytes(n & CellFlag.WALL for n in maze.cells)
+        header = f'{maze.width_in_cells}x{maze.height_in_cells}:'.encode()
+        return hashlib.sha1(header + walls).hexdigest()
+
+    @staticmethod
+    def _find_nodes(maze: Maze) -> tuple[array, list[int]]:
+        nodes = array('i', [-1]) * len(maze.cells)
+        cells = []
+        for idx, n in enumerate(maze.cells):
+            if not n & CellFlag.WALL:
+                nodes[idx] = len(cells)
+                cells.append(idx)
+        return nodes, cells
+
+    @classmethod
+    def for_maze(cls, maze: Maze) -> Optional[NavigationTable]:
+        """ Loads table for given maze from cache or builds it.
+        Returns None if maze is too big to keep table in memory
+        """
+
+        key = cls.layout_hash(maze)
+        if key in cls._loaded:
+            return cls._loaded[key]
+
+        nodes, cells = cls._find_nodes(maze)
+        if len(cells) > cls.MAX_CELLS:
+            return None
+
+        path = os.path.join(app.resource_path(cls.CACHE_PATH), f'{key}.nav')
+        table = cls._read(path, maze.width_in_cells, nodes, len(cells))
+        if table is None:
+            table = cls.build(maze, nodes, cells)
+            table._write(path)
+
+        cls._loaded[key] = table
+        return table
+
+    @classmethod
+    def build(cls, maze: Maze, nodes: array, cells: list[int]) -> NavigationTable:
+        """ Runs breadth-first search from every walkable cell """
+
+        w, h = maze.width_in_cells, maze.height_in_cells
+        size = len(cells)
+        distances = array('H', [cls.UNREACHABLE]) * (size * size)
+        directions = bytearray([cls.NO_DIRECTION]) * (size * size)
+
+        for src, src_idx in enumerate(cells):
+            row = src * size
+            distances[row + src] = 0
+
+            q = deque([src_idx])
+            while q:
+                u = q.popleft()
+                u_node = nodes[u]
+                u_y, u_x = divmod(u, w)
+                for (dx, dy), direction in cls.STEPS:
+                    v_x, v_y = u_x + dx, u_y + dy
+                    if not (0 <= v_x < w and 0 <= v_y < h):
+                        continue
+
+                    v_node = nodes[v_y * w + v_x]
+                    if v_node == -1 or distances[row + v_node] != cls.UNREACHABLE:
+                        continue
+
+                    distances[row + v_node] = distances[row + u_node] + 1
+
+                    # First step of path is inherited from the previous cell
+                    directions[row + v_node] = direction if u == src_idx else directions[row + u_node]
+                    q.append(v_y * w + v_x)
+
+        return cls(w, nodes, size, distances, directions)
+
+    @classmethod
+    def _read(cls, path: str, width: int, nodes: array, size: int) -> Optional[NavigationTable]:
+        try:
+            with open(path, 'rb') as f:
+                if f.read(len(cls.FILE_SIGNATURE)) != cls.FILE_SIGNATURE:
+                    return None
+
+                distances = array('H')
+                distances.fromfile(f, size * size)
+                directions = bytearray(f.read(size * size))
+        except (OSError, EOFError):
+            return None
+
+        if len(directions) != size * size:
+            return None
+        return cls(width, nodes, size, distances, directions)
+
+    def _write(self, path: str):
+        # Several processes can build the same table at once, so file
+        # is written under temporary name and then replaced atomically
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(NavigationTable.FILE_SIGNATURE)
+                self.distances.tofile(f)
+                f.write(self.directions)
+            os.replace(tmp_path, path)
+        except OSError:
+            # Cache is optional, table will be built again next time
+            pass
+
+    def _pair(self, src: tuple[int, int], dst: tuple[int, int]) -> Optional[int]:
+        if not (0 <= src[0] < self.width and 0 <= src[1] < self.height and \
+                0 <= dst[0] < self.width and 0 <= dst[1] < self.height):
+            return None
+
+        src_node = self.nodes[src[1] * self.width + src[0]]
+        dst_node = self.nodes[dst[1] * self.width + dst[0]]
+        if src_node == -1 or dst_node == -1:
+            return None
+        return src_node * self.size + dst_node
+
+    def distance(self, src: tuple[int, int], dst: tuple[int, int]) -> Union[int, float]:
+        """ Length of the shortest path between two cells, or inf if there's none """
+
+        pair = self._pair(src, dst)
+        if pair is None or self.distances[pair] == NavigationTable.UNREACHABLE:
+            return float('inf')
+        return self.distances[pair]
+
+    def next_direction(self, src: tuple[int, int], dst: tuple[int, int]) -> Optional[int]:
+        """ Direction of the first step of the shortest path from src to dst.
+        Returns None if src and dst match or there's no path between them
+        """
+
+        pair = self._pair(src, dst)
+        if pair is None or self.directions[pair] == NavigationTable.NO_DIRECTION:
+            return None
+        return self.directions[pair]
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
-from random import choice
 from typing import TYPE_CHECKING
+from app.states.game.maze import CellFlag
 from app.states.game.moving_creature import MovingCreature
 from utilities.direction import Direction, opposite
 
@@ -15,7 +15,7 @@ class Pacman(MovingCreature):
     def __init__(self, game: Game):
         super().__init__(game=game, 
                          start_cell=game.maze.pacman_start,
-                         sprite=choice(game.app.theme.player),
+                         sprite=game.rng.choice(game.app.theme.player),
                          seconds_for_cell=Pacman.SECONDS_PER_CELL)
         self.hashed_direction = None
 
@@ -23,7 +23,7 @@ class Pacman(MovingCreature):
         self.game.pacman = Pacman(self.game)
     
     def get_direction(self):
-        cell = self.game.maze.grid[self.cell[1]][self.cell[0]]
+        cell = self.game.maze.cell(self.cell)
         if (self.hashed_direction == Direction.N and cell.can_go_N) or \
             (self.hashed_direction == Direction.E and cell.can_go_E) or \
             (self.hashed_direction == Direction.S and cell.can_go_S) or \
@@ -48,21 +48,20 @@ class Pacman(MovingCreature):
     def move(self):
         super().move()
 
-        current_cell = self.game.maze.grid[self.cell[1]][self.cell[0]]
-        if current_cell.has_collectible:
-            if current_cell.has_dot:
-                current_cell.has_dot = False
+        maze = self.game.maze
+        eaten = maze.collectibles.consume(maze.index(self.cell))
+        if eaten:
+            if eaten & CellFlag.DOT:
                 self.game.score += 10
 
-            if current_cell.has_fruit:
-                current_cell.has_fruit = False
-                self.game.score += choice((100, 200, 300))
+            if eaten & CellFlag.FRUIT:
+                self.game.score += self.game.rng.choice((100, 200, 300))
 
-            if current_cell.has_energizer:
-                current_cell.has_energizer = False
+            if eaten & CellFlag.ENERGIZER:
                 self.game.score += 50
                 self.game.activate_scare()
 
-            self.game.maze.collectibles_amount -= 1
-            if self.game.maze.collectibles_amount == 0:
+            self.game.eaten_cells.append(self.cell)
+            self.game.static_layer.patch(self.cell)
+            if maze.collectibles.remaining == 0:
                 self.game.next_level()
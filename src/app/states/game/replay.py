@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import os
+import struct
+import zlib
+from array import array
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.states.game import Game
+
+
+class InvalidReplayError(Exception):
+    def __init__(self, msg="Bad replay file"):
+        super().__init__(msg)
+
+
+def state_digest(game: Game) -> int:
+    """ Checksum of everything that game logic depends on. Two sessions
+    that went the same way have equal digests
+    """
+
+    creatures = [game.pacman] + game.ghosts
+    state = [game.ticks, game.score, game.lives, game.scare_timer, game.rng.getstate()]
+    state += [(c.cell, c.goal, c.direction, c.move_direction, c.movement_frame, c.frames_per_cell)
+              for c in creatures]
+
+    # Collectibles are kept apart from cells, but are 
+    # hashed as flags of cells, like they were stored before
+    maze = game.maze
+    cells = array('H', (n | flags for n, flags in zip(maze.cells, maze.collectibles.flags)))
+
+    digest = zlib.crc32(repr(state).encode())
+    return zlib.crc32(cells.tobytes(), digest)
+
+
+class Replay:
+    """ Seed of the session and every direction pressed during it.
+    Game is deterministic, so this is enough to play session again
+    exactly as it went
+    """
+
+    # Version is raised whenever game logic changes, 
+    # since older sessions would be played differently
+    FILE_SIGNATURE = b'PMREP2'
+
+    # seed, ticks, score, lives, digest
+    HEADER = struct.Struct('<IIIiI')
+    # tick, direction
+    INPUT = struct.Struct('<IB')
+
+    def __init__(self, seed: int, theme_name: str, inputs: list[tuple[int, int]],
+                 ticks: int, score: int, lives: int, digest: int):
+        """
+        Args:
+            seed (int): Seed of the first game of the session
+            theme_name (str): Theme session was played with. Sprite
+            variations are chosen randomly, so it affects random numbers
+            inputs (list[tuple[int, int]]): Directions with the tick
+            before which they were pressed, in order of pressing
+            ticks (int): Amount of ticks session lasted
+            score (int): Score at the end of the session
+            lives (int): Lives left at the end of the session
+            digest (int): State digest at the end of the session
+        """
+
+        self.seed = seed
+        self.theme_name = theme_name
+        self.inputs = inputs
+        self.ticks = ticks
+        self.score = score
+        self.lives = lives
+        self.digest = digest
+
+    def inputs_by_tick(self) -> dict[int, tuple[int, ...]]:
+        """ Directions pressed before each tick """
+
+        by_tick = {}
+        for tick, direction in self.inputs:
+            by_tick[tick] = by_tick.get(tick, ()) + (direction,)
+        return by_tick
+
+    def matches(self, game: Game) -> bool:
+        """ Checks if game has ended up in the same state as recorded one """
+
+        return game.score == self.score and game.lives == self.lives and \
+               state_digest(game) == self.digest
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        theme_name = self.theme_name.encode()
+        with open(path, 'wb') as f:
+            f.write(Replay.FILE_SIGNATURE)
+            f.write(Replay.HEADER.pack(self.seed, self.ticks, self.score, self.lives, self.digest))
+            f.write(struct.pack('<B', len(theme_name)) + theme_name)
+            f.write(struct.pack('<I', len(self.inputs)))
+            for tick, direction in self.inputs:
+                f.write(Replay.INPUT.pack(tick, direction))
+
+    @classmethod
+    def load(cls, path: str) -> Replay:
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        try:
+            if not data.startswith(cls.FILE_SIGNATURE):
+                raise InvalidReplayError(f'{path} is not a replay file')
+            offset = len(cls.FILE_SIGNATURE)
+
+            seed, ticks, score, lives, digest = cls.HEADER.unpack_from(data, offset)
+            offset += cls.HEADER.size
+
+            name_length, = struct.unpack_from('<B', data, offset)
+            theme_name = data[offset + 1:offset + 1 + name_length].decode()
+            offset += 1 + name_length
+
+            count, = struct.unpack_from('<I', data, offset)
+            offset += 4
+            inputs = [cls.INPUT.unpack_from(data, offset + i * cls.INPUT.size) for i in range(count)]
+        except (struct.error, UnicodeDecodeError):
+            raise InvalidReplayError(f'{path} is damaged')
+
+        return cls(seed, theme_name, inputs, ticks, score, lives, digest)
+
+
+class InputRecorder:
+    """ Logs directions pressed during the session. Ticks are
+    counted through all levels, so one recording covers the
+    whole session
+    """
+
+    def __init__(self, seed: int, theme_name: str):
+        self.seed = seed
+        self.theme_name = theme_name
+        self.ticks = 0
+        self.inputs: list[tuple[int, int]] = []
+
+    def tick(self):
+        """ Is called on every update of unpaused game """
+        self.ticks += 1
+
+    def record(self, direction: int):
+        """ Is called when player presses direction """
+        self.inputs.append((self.ticks, direction))
+
+    def finish(self, game: Game) -> Replay:
+        """ Creates replay of the session, which ended in given game state """
+
+        return Replay(self.seed, self.theme_name or '', list(self.inputs), self.ticks,
+                      game.score, game.lives, state_digest(game))
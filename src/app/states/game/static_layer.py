@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import pygame
+from collections import OrderedDict
+from math import floor, lcm
+from typing import TYPE_CHECKING, Optional
+from app.states.game.maze import Maze, MazeCell
+from app.states.game.visibility import VisibleSpans
+
+if TYPE_CHECKING:
+    from app.states.game import Game
+
+
+class StaticLayer:
+    """ Cache of maze floor, walls and collectibles, baked into isometric
+    chunks. Chunk is a square of CHUNK_SIZE x CHUNK_SIZE maze cells, which
+    is rendered once to its own surface and then only blitted to screen.
+    Once collectibles of a cell are eaten, only the part of the chunk
+    around them is redrawn.
+    Collectibles with animated sprites change every frame, so they are
+    drawn over the chunks instead. Animated floor and walls are baked for
+    every frame of their animation if that fits into the budget, and
+    are drawn cell by cell otherwise
+    """
+
+    CHUNK_SIZE = 4
+
+    # Baked chunks take at most this amount of memory,
+    # but chunks on screen are always kept
+    BUDGET_BYTES = 48 * 1024 * 1024
+
+    def __init__(self, game: Game):
+        self.game = game
+        self._chunks: OrderedDict[tuple[int, int, int], tuple[pygame.Surface, tuple[float, float]]] = OrderedDict()
+        self.size_in_bytes = 0
+
+        self._chunk_spans = VisibleSpans(game)
+        self._collectible_spans = VisibleSpans(game)
+        self._visible_spans = None
+        self._visible_chunks: list[tuple[int, int]] = []
+        self._visible_bytes = 0
+        self._calculate_margins()
+
+    @property
+    def maze(self) -> Maze:
+        return self.game.maze
+
+    def _calculate_margins(self):
+        """ Finds how far sprites can stick out of the cell center,
+        so chunk surfaces are big enough to hold them
+        """
+
+        theme = self.game.app.theme
+        self._margin_x = MazeCell.CELL_WIDTH/2
+        self._margin_top = MazeCell.CELL_HEIGHT/2
+        self._margin_bottom = MazeCell.CELL_HEIGHT/2
+        self._period = 1
+
+        for sprite in theme.floor:
+            for idx in range(sprite.amount):
+                w, h = sprite.frame(idx).get_size()
+                self._margin_x = max(self._margin_x, w/2)
+                self._margin_top = max(self._margin_top, h/2)
+                self._margin_bottom = max(self._margin_bottom, h/2)
+            self._period = lcm(self._period, sprite.amount)
+
+        for sprite in theme.wall:
+            for idx in range(sprite.amount):
+                w, h = sprite.frame(idx).get_size()
+                self._margin_x = max(self._margin_x, w/2 + MazeCell.CELL_WIDTH/4)
+                self._margin_top = max(self._margin_top, h)
+            self._period = lcm(self._period, sprite.amount)
+
+        # Size of the area around the cell center covered by
+        # collectibles. One extra pixel covers rounding of positions
+        self._collectible_w = self._collectible_h = 0
+        self._animated_collectibles = False
+        for sprite in theme.dot + theme.energizer + theme.fruit:
+            for idx in range(sprite.amount):
+                w, h = sprite.frame(idx).get_size()
+                self._collectible_w = max(self._collectible_w, w + 2)
+                self._collectible_h = max(self._collectible_h, h + 2)
+            self._animated_collectibles |= sprite.amount > 1
+
+        self._margin_x = max(self._margin_x, self._collectible_w/2)
+        self._margin_top = max(self._margin_top, self._collectible_h/2)
+        self._margin_bottom = max(self._margin_bottom, self._collectible_h/2)
+
+        self._chunk_spans.set_margins(self._margin_x, self._margin_top, self._margin_bottom)
+        self._collectible_spans.set_margins(self._collectible_w/2, self._collectible_h/2, 
+                                            self._collectible_h/2)
+
+    def invalidate(self):
+        """ Drops all baked chunks. Should be called when theme
+        or display mode changes
+        """
+
+        self._chunks.clear()
+        self.size_in_bytes = 0
+        self._chunk_spans.invalidate()
+        self._collectible_spans.invalidate()
+        self._calculate_margins()
+
+    def _chunk_cells(self, chunk: tuple[int, int]) -> tuple[int, int, int, int]:
+        """ Returns [x0, y0, x1, y1] - inclusive range of maze
+        cells covered by the chunk
+        """
+
+        cx, cy = chunk
+        x0, y0 = cx * StaticLayer.CHUNK_SIZE, cy * StaticLayer.CHUNK_SIZE
+        x1 = min(x0 + StaticLayer.CHUNK_SIZE, self.maze.width_in_cells) - 1
+        y1 = min(y0 + StaticLayer.CHUNK_SIZE, self.maze.height_in_cells) - 1
+        return x0, y0, x1, y1
+
+    def _chunk_rect(self, chunk: tuple[int, int]) -> pygame.Rect:
+        """ Bounding rectangle of the chunk relative to the center
+        of the cell in the north-east corner of the maze
+        """
+
+        x0, y0, x1, y1 = self._chunk_cells(chunk)
+        left = MazeCell.CELL_WIDTH/2 * (x0 - y1) - self._margin_x
+        right = MazeCell.CELL_WIDTH/2 * (x1 - y0) + self._margin_x
+        top = MazeCell.CELL_HEIGHT/2 * (x0 + y0) - self._margin_top
+        bottom = MazeCell.CELL_HEIGHT/2 * (x1 + y1) + self._margin_bottom
+
+        left, top = floor(left), floor(top)
+        return pygame.Rect(left, top, int(right - left) + 1, int(bottom - top) + 1)
+
+    def _draw_cells(self, surface: pygame.Surface, chunk: tuple[int, int], 
+                    topleft: tuple[int, int], frame_shift: int,
+                    area: Optional[pygame.Rect] = None) -> None:
+        """ Draws cells of the chunk to its surface, which has given top
+        left corner relative to the maze. If area relative to the maze
+        is given, only cells whose sprites can reach it are drawn
+        """
+
+        # Cells are drawn from north to south, so walls
+        # of southern cells overlap northern ones
+        x0, y0, x1, y1 = self._chunk_cells(chunk)
+        cells = [(x, y) for y in range(y0, y1 + 1) for x in range(x0, x1 + 1)]
+        cells.sort(key=lambda cell: (cell[0] + cell[1], cell[0]))
+
+        # Frames of all cells are drawn with a single call, most
+        # of them are subsurfaces of the same theme atlas page
+        left, top = topleft
+        blits = []
+        for mz_coords in cells:
+            off_x, off_y = Maze.get_cell_offset(mz_coords)
+            if area is not None:
+                # One extra pixel covers rounding of sprite positions
+                reach = pygame.Rect(off_x - self._margin_x - 1, off_y - self._margin_top - 1,
+                                    2 * self._margin_x + 2, self._margin_top + self._margin_bottom + 2)
+                if not reach.colliderect(area):
+                    continue
+
+            cell = self.maze.cell(mz_coords)
+            blits += cell.static_blits((off_x - left, off_y - top), frame_shift)
+            blits += cell.collectible_blits((off_x - left, off_y - top), frame_shift)
+
+        surface.blits(blits, doreturn=False)
+
+    def _bake(self, chunk: tuple[int, int], frame_shift: int) -> tuple[pygame.Surface, tuple[float, float]]:
+        rect = self._chunk_rect(chunk)
+        surface = pygame.Surface(rect.size, pygame.SRCALPHA).convert_alpha()
+        surface.fill((0, 0, 0, 0))
+        self._draw_cells(surface, chunk, rect.topleft, frame_shift)
+        return surface, rect.topleft
+
+    def patch(self, mz_coords: tuple[int, int]) -> None:
+        """ Redraws area around collectibles of the cell in baked 
+        chunks. Should be called after the cell's collectibles are eaten
+        """
+
+        chunk = mz_coords[0] // StaticLayer.CHUNK_SIZE, mz_coords[1] // StaticLayer.CHUNK_SIZE
+        area = pygame.Rect(0, 0, self._collectible_w, self._collectible_h)
+        area.center = Maze.get_cell_offset(mz_coords)
+
+        # Drawing cells that reach the area clipped to it gives
+        # the same pixels as baking the whole chunk again
+        for (cx, cy, frame_shift), (surface, (left, top)) in self._chunks.items():
+            if (cx, cy) == chunk:
+                surface.set_clip(area.move(-left, -top))
+                surface.fill((0, 0, 0, 0))
+                self._draw_cells(surface, chunk, (left, top), frame_shift, area)
+                surface.set_clip(None)
+
+    def _get_chunk(self, chunk: tuple[int, int], frame_shift: int) -> tuple[pygame.Surface, tuple[float, float]]:
+        key = chunk[0], chunk[1], frame_shift
+        if key in self._chunks:
+            self._chunks.move_to_end(key)
+        else:
+            self._chunks[key] = self._bake(chunk, frame_shift)
+            surface = self._chunks[key][0]
+            self.size_in_bytes += surface.get_pitch() * surface.get_height()
+
+        return self._chunks[key]
+
+    def _evict(self, keep: int) -> None:
+        """ Forgets least recently drawn chunks until the rest fit into
+        the budget, but never given amount of the most recently drawn ones
+        """
+
+        while self.size_in_bytes > StaticLayer.BUDGET_BYTES and len(self._chunks) > keep:
+            _, (surface, _) = self._chunks.popitem(last=False)
+            self.size_in_bytes -= surface.get_pitch() * surface.get_height()
+
+    def visible_chunks(self) -> list[tuple[int, int]]:
+        """ Returns chunks that have visible cells in the order
+        they should be drawn. The same list is returned until
+        camera or screen size changes
+        """
+
+        spans = self._chunk_spans.spans()
+        if spans is not self._visible_spans:
+            self._visible_spans = spans
+
+            chunks = set()
+            for y, x_start, x_end in spans:
+                cy = y // StaticLayer.CHUNK_SIZE
+                for cx in range(x_start // StaticLayer.CHUNK_SIZE, (x_end - 1) // StaticLayer.CHUNK_SIZE + 1):
+                    chunks.add((cx, cy))
+
+            self._visible_chunks = sorted(chunks, key=lambda chunk: (chunk[0] + chunk[1], chunk[0]))
+            self._visible_bytes = sum(4 * rect.w * rect.h for rect in map(self._chunk_rect, chunks))
+
+        return self._visible_chunks
+
+    def _draw_animated_collectibles(self) -> None:
+        screen = self.game.app.screen
+        step = self.game.animation.step
+        ne_x, ne_y = self.maze.ne_corner
+        flags = self.maze.collectibles.flags
+        width = self.maze.width_in_cells
+
+        blits = []
+        for y, x_start, x_end in self._collectible_spans.spans():
+            for x in range(x_start, x_end):
+                idx = y * width + x
+                if flags[idx]:
+                    off_x, off_y = Maze.get_cell_offset((x, y))
+                    blits += MazeCell(self.maze, idx).collectible_blits((ne_x + off_x, ne_y + off_y), 
+                                                                        step, animated=True)
+
+        screen.blits(blits, doreturn=False)
+
+    def draw(self):
+        """ Draws visible part of the maze to screen """
+
+        # Chunks are the same every period frames
+        frame_shift = self.game.animation.step % self._period
+
+        ne_x, ne_y = self.maze.ne_corner
+        screen = self.game.app.screen
+        chunks = self.visible_chunks()
+
+        # If chunks of every frame don't fit into the budget, all
+        # of them would be baked again every frame, which is slower
+        # than drawing cells right to the screen
+        if self._period > 1 and self._period * self._visible_bytes > StaticLayer.BUDGET_BYTES:
+            for chunk in chunks:
+                self._draw_cells(screen, chunk, (-ne_x, -ne_y), frame_shift)
+        else:
+            blits = []
+            for chunk in chunks:
+                surface, (left, top) = self._get_chunk(chunk, frame_shift)
+                blits.append((surface, (ne_x + left, ne_y + top)))
+            screen.blits(blits, doreturn=False)
+            self._evict(len(chunks))
+
+        if self._animated_collectibles:
+            self._draw_animated_collectibles()
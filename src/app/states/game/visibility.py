@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from math import ceil, floor
+from typing import TYPE_CHECKING
+from app.states.game.maze import MazeCell
+
+if TYPE_CHECKING:
+    from app.states.game import Game
+
+
+class VisibleSpans:
+    """ Parts of maze rows whose cells can be seen on screen.
+    Screen is a rectangle, which is a rotated rectangle in maze
+    coordinates, so every row crosses it as a single span of cells.
+    Spans are recalculated only when camera or screen size changes
+    """
+
+    def __init__(self, game: Game):
+        self.game = game
+        self._key = None
+        self._spans: list[tuple[int, int, int]] = []
+        self.set_margins(0, 0, 0)
+
+    def set_margins(self, margin_x: float, margin_top: float, margin_bottom: float):
+        """ Sets how far sprites drawn for every cell stick out of
+        the cell center sideways, up and down. Should be called
+        when theme changes
+        """
+
+        # One extra pixel covers rounding of sprite positions
+        self._margin_x = margin_x + 1
+        self._margin_top = margin_top + 1
+        self._margin_bottom = margin_bottom + 1
+        self._key = None
+
+    def invalidate(self):
+        """ Should be called when display mode changes """
+        self._key = None
+
+    def spans(self) -> list[tuple[int, int, int]]:
+        """ Returns list of (y, x_start, x_end) - rows with visible
+        cells in range [x_start, x_end), ordered from north to south.
+        The same list is returned until spans change
+        """
+
+        maze = self.game.maze
+        ne_x, ne_y = maze.ne_corner
+        sc_w, sc_h = self.game.app.screen.get_size()
+
+        key = ne_x, ne_y, sc_w, sc_h
+        if key == self._key:
+            return self._spans
+        self._key = key
+
+        # Cell (x, y) is visible if its sprites overlap the screen:
+        # u_lo < x - y < u_hi and v_lo < x + y < v_hi
+        half_w, half_h = MazeCell.CELL_WIDTH/2, MazeCell.CELL_HEIGHT/2
+        u_lo = (-self._margin_x - ne_x) / half_w
+        u_hi = (sc_w + self._margin_x - ne_x) / half_w
+        v_lo = (-self._margin_bottom - ne_y) / half_h
+        v_hi = (sc_h + self._margin_top - ne_y) / half_h
+
+        width, height = maze.width_in_cells, maze.height_in_cells
+        y_start = max(0, floor((v_lo - u_hi) / 2) + 1)
+        y_end = min(height, ceil((v_hi - u_lo) / 2))
+
+        self._spans = []
+        for y in range(y_start, y_end):
+            x_start = max(0, floor(max(u_lo + y, v_lo - y)) + 1)
+            x_end = min(width, ceil(min(u_hi + y, v_hi - y)))
+            if x_start < x_end:
+                self._spans.append((y, x_start, x_end))
+
+        return self._spans
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import threading
+from typing import Optional
+from app.states.game.maze import Maze
+from app.themes import Theme
+
+
+class Loader:
+    """ Loads theme and levels in background thread, so loading
+    screen keeps drawing and handling events meanwhile. Images are
+    only decoded there, and are converted to display format once
+    main thread takes the theme.
+    Progress of every part is weighted by its share of the whole work
+    """
+
+    # Shares of the whole work taken by level files and by sprites that 
+    # aren't needed until the game starts. The rest is taken by theme images
+    LEVELS_SHARE = 0.05
+    LAZY_SPRITES_SHARE = 0.15
+
+    def __init__(self, theme_name: str):
+        self.theme_name = theme_name
+        self.fraction = 0.0
+
+        self._theme: Optional[Theme] = None
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name='loader', daemon=True)
+        self._thread.start()
+
+    @property
+    def done(self) -> bool:
+        return not self._thread.is_alive()
+
+    def _on_theme_progress(self, done: int, total: int) -> None:
+        theme_share = 1 - Loader.LEVELS_SHARE - Loader.LAZY_SPRITES_SHARE
+        self.fraction = Loader.LEVELS_SHARE + theme_share * done / total
+
+    def _on_lazy_sprites_progress(self, done: int, total: int) -> None:
+        self.fraction = 1 - Loader.LAZY_SPRITES_SHARE * (1 - done / total)
+
+    def _run(self) -> None:
+        try:
+            Maze.load_levels()
+            self.fraction = Loader.LEVELS_SHARE
+            theme = Theme.load_theme(self.theme_name, on_progress=self._on_theme_progress, convert=False)
+            self.fraction = 1 - Loader.LAZY_SPRITES_SHARE
+            theme.prefetch(on_progress=self._on_lazy_sprites_progress)
+            self._theme = theme
+            self.fraction = 1.0
+        except BaseException as error:
+            # Is raised again in the main thread
+            self._error = error
+
+    def wait(self) -> Theme:
+        """ Blocks until everything is loaded. Returns loaded theme
+        converted to display format or raises exception that stopped
+        loading. Conversion needs display, so it must be called
+        from main thread
+        """
+
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        self._theme.convert()
+        return self._theme
@@ -49,16 +49,19 @@ class Menu(AppState):
         self.mx_scoreboard_width = 0
         for i, entry in enumerate(self.scoreboard_entries):
             name, result = entry
-            text = Menu.SCOREBOARD_FONT.render(f'{1 + i}. {name}: {result}', True, Menu.BUTTON_FG_INACTIVE)
+            text = self.app.text_cache.render(Menu.SCOREBOARD_FONT, f'{1 + i}. {name}: {result}', True, Menu.BUTTON_FG_INACTIVE)
             self.mx_scoreboard_width = max(self.mx_scoreboard_width, text.get_width())
         self.mx_scoreboard_width += 2 * Menu.SCOREBOARD_PADDING
 
         self.mx_button_width = 0
         for button in self.buttons:
-            text = Menu.BUTTON_FONT_ACTIVE.render(button, True, Menu.BUTTON_FG_ACTIVE)
+            text = self.app.text_cache.render(Menu.BUTTON_FONT_ACTIVE, button, True, Menu.BUTTON_FG_ACTIVE)
             self.mx_button_width = max(self.mx_button_width, text.get_width())
         self.mx_button_width += 2 * Menu.BUTTON_PADDING
 
+        # What was shown on the screen last time
+        self.drawn_key = None
+
     def draw(self):
         # Draw background
         sc_w, sc_h = self.app.screen.get_size()
@@ -98,7 +101,7 @@ class Menu(AppState):
             height = scoreboard_top + Menu.SCOREBOARD_PADDING
             for i, entry in enumerate(self.scoreboard_entries):
                 name, result = entry
-                text = Menu.SCOREBOARD_FONT.render(f'{1 + i}. {name}: {result}', True, Menu.BUTTON_FG_INACTIVE)
+                text = self.app.text_cache.render(Menu.SCOREBOARD_FONT, f'{1 + i}. {name}: {result}', True, Menu.BUTTON_FG_INACTIVE)
                 pos = text.get_rect(topleft=((sc_w - self.mx_scoreboard_width)/2 + Menu.SCOREBOARD_PADDING, height))
                 self.app.screen.blit(text, pos)
                 height += Menu.SCOREBOARD_FONT.get_height() + Menu.SCOREBOARD_BETWEEN_PADDING
@@ -106,14 +109,10 @@ class Menu(AppState):
             height = scoreboard_top + scoreboard_height + Menu.BUTTON_PADDING
             for i, button in enumerate(self.buttons):
                 if i == self.selection:
-                    text = Menu.BUTTON_FONT_ACTIVE.render(
-                        button, True, Menu.BUTTON_FG_ACTIVE
-                    )
+                    text = self.app.text_cache.render(Menu.BUTTON_FONT_ACTIVE, button, True, Menu.BUTTON_FG_ACTIVE)
                     height += text.get_height()
                 else:
-                    text = Menu.BUTTON_FONT_INACTIVE.render(
-                        button, True, Menu.BUTTON_FG_INACTIVE
-                    )
+                    text = self.app.text_cache.render(Menu.BUTTON_FONT_INACTIVE, button, True, Menu.BUTTON_FG_INACTIVE)
                     height += text.get_height()
 
                 pos = text.get_rect(midbottom=(sc_w/2, height))
@@ -137,14 +136,10 @@ class Menu(AppState):
             height = (sc_h - button_surface_height) / 2 + Menu.BUTTON_PADDING
             for i, button in enumerate(self.buttons):
                 if i == self.selection:
-                    text = Menu.BUTTON_FONT_ACTIVE.render(
-                        button, True, Menu.BUTTON_FG_ACTIVE
-                    )
+                    text = self.app.text_cache.render(Menu.BUTTON_FONT_ACTIVE, button, True, Menu.BUTTON_FG_ACTIVE)
                     height += text.get_height()
                 else:
-                    text = Menu.BUTTON_FONT_INACTIVE.render(
-                        button, True, Menu.BUTTON_FG_INACTIVE
-                    )
+                    text = self.app.text_cache.render(Menu.BUTTON_FONT_INACTIVE, button, True, Menu.BUTTON_FG_INACTIVE)
                     height += text.get_height()
 
                 pos = text.get_rect(midbottom=(sc_w/2, height))
@@ -152,6 +147,15 @@ class Menu(AppState):
                 height += Menu.BUTTON_PADDING
             
 
+    def dirty_rects(self):
+        # Menu changes only when another button is selected
+        key = self.app.screen.get_size(), self.in_scoreboard, tuple(self.buttons), self.selection
+        drawn_key, self.drawn_key = self.drawn_key, key
+        return [] if key == drawn_key else None
+
+    def invalidate(self):
+        self.drawn_key = None
+
     def handle_event(self, event):
         if event.type == pygame.KEYDOWN:
             if event.key in [pygame.K_UP, pygame.K_w]:
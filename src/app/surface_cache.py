@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import pygame
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+
+class SurfaceCache:
+    """ Surfaces that are expensive to make, by key. When surfaces 
+    take more than budget, the least recently used ones are dropped 
+    and made again when needed
+    """
+
+    def __init__(self, budget_bytes: int):
+        self.budget_bytes = budget_bytes
+        self.size_in_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._surfaces: OrderedDict[Hashable, pygame.Surface] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._surfaces)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._surfaces
+
+    @property
+    def hit_rate(self) -> float:
+        requests = self.hits + self.misses
+        return self.hits / requests if requests else 0.0
+
+    @staticmethod
+    def _size(surface: pygame.Surface) -> int:
+        return surface.get_pitch() * surface.get_height()
+
+    def get(self, key: Hashable, make: Callable[[], pygame.Surface]) -> pygame.Surface:
+        """ Returns surface stored by key, or makes and stores it """
+
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = make()
+        self._surfaces[key] = surface
+        self.size_in_bytes += SurfaceCache._size(surface)
+
+        # Surface that was just made is kept even if it doesn't fit alone
+        while self.size_in_bytes > self.budget_bytes and len(self._surfaces) > 1:
+            _, dropped = self._surfaces.popitem(last=False)
+            self.size_in_bytes -= SurfaceCache._size(dropped)
+
+        return surface
+
+    def clear(self) -> None:
+        self._surfaces.clear()
+        self.size_in_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> str:
+        return f'{len(self)}, {self.size_in_bytes / 2**20:.1f} MB, hit rate {self.hit_rate * 100:.1f} %'
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import pygame
+from app.surface_cache import SurfaceCache
+
+
+class TextCache(SurfaceCache):
+    """ Rendered text surfaces. Most of labels never change,
+    so every one of them is rendered only once
+    """
+
+    BUDGET_BYTES = 8 * 1024 * 1024
+
+    def __init__(self, budget_bytes: int = BUDGET_BYTES):
+        super().__init__(budget_bytes)
+
+    def render(self, font: pygame.font.Font, text: str, antialias: bool, 
+               color: tuple[int, int, int]) -> pygame.Surface:
+        """ Same as font.render, but returned surface must not be changed """
+
+        key = font, text, antialias, tuple(color)
+        return self.get(key, lambda: font.render(text, antialias, color))
+
+    def __str__(self) -> str:
+        return f'rendered texts: {self.stats()}'
@@ -1,5 +1,10 @@
 import os
+import pygame
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
 
+from app.themes.atlas import Atlas
+from app.themes.bundle import ThemeBundle
 from app.themes.sprite import *
 import app
 
@@ -18,17 +23,85 @@ class Theme:
         "wall": SingleDirectionAnimatedSprite,
     }
 
-    def __init__(self, sprites: dict[str, list[AnimatedSprite]]):
+    # Sprites that aren't needed until the game starts. 
+    # They are loaded on first access to their property
+    LAZY_SPRITE_TYPES = "enemy_scare", "fruit", "life"
+
+    # Images are decoded by this amount of threads
+    DECODING_THREADS = min(8, os.cpu_count() or 1)
+
+    def __init__(self, sprites: dict[str, list[AnimatedSprite]], name: str = None, 
+                 atlas: Atlas = None, headless: bool = False, converted: bool = True):
         self._sprites = sprites
+        self.name = name
+        self.atlas = atlas
+        self.headless = headless
+        self.converted = converted
 
-    @classmethod
-    def _load_sprite_variations(cls, sprite_path, sprite_type) -> list[AnimatedSprite]:
+    def _load_lazy(self, sprite_types: list[str], 
+                   on_progress: Optional[Callable[[int, int], None]] = None) -> None:
+        """ Loads sprites of given types the same way the theme was loaded """
+
+        theme_root = app.resource_path(os.path.join(Theme.PATH, self.name))
+        sprites, atlas = Theme._load_sprites(theme_root, self.name, sprite_types, 
+                                             self.headless, on_progress, self.converted)
+        self._sprites.update(sprites)
+        if atlas is not None:
+            self.atlas.extend(atlas)
+
+    def _sprite(self, sprite_type: str) -> list[AnimatedSprite]:
+        if sprite_type not in self._sprites:
+            self._load_lazy([sprite_type])
+        return self._sprites[sprite_type]
+
+    def prefetch(self, on_progress: Optional[Callable[[int, int], None]] = None) -> None:
+        """ Loads every sprite from LAZY_SPRITE_TYPES that isn't loaded yet,
+        so they don't have to be decoded once game starts
+
+        Args:
+            on_progress (Callable[[int, int], None], optional): Same as in 
+            Theme.load_theme. Defaults to None.
+        """
+
+        sprite_types = [sprite_type for sprite_type in Theme.LAZY_SPRITE_TYPES
+                        if sprite_type not in self._sprites]
+        if sprite_types:
+            self._load_lazy(sprite_types, on_progress)
+
+    def convert(self) -> None:
+        """ Converts images of theme loaded with convert=False to display 
+        format. Needs display mode, so it must be called from main thread
+        """
+
+        if self.converted:
+            return
+
+        self.atlas, moved = self.atlas.converted()
+        for variations in self._sprites.values():
+            for sprite in variations:
+                sprite.replace_surfaces(moved[id(frame)] for frame in sprite.surfaces())
+        self.converted = True
+
+    @staticmethod
+    def _pack(sprites: dict[str, list[AnimatedSprite]], convert: bool = True) -> Atlas:
+        """ Moves frames of all sprites into single atlas """
+
+        all_sprites = [sprite for variations in sprites.values() for sprite in variations]
+        atlas = Atlas.pack([img for sprite in all_sprites for img in sprite.surfaces()], convert)
+
+        packed = iter(atlas.frames)
+        for sprite in all_sprites:
+            sprite.replace_surfaces(packed)
+        return atlas
+
+    @staticmethod
+    def _variation_paths(sprite_path) -> list[str]:
         variations = []
 
         i = 0
         variation_path = os.path.join(sprite_path, str(i))
         while os.path.exists(variation_path):
-            variations.append(sprite_type.load(variation_path))
+            variations.append(variation_path)
 
             i += 1
             variation_path = os.path.join(sprite_path, str(i))
@@ -41,74 +114,170 @@ class Theme:
         return variations
 
     @classmethod
-    def load_theme(cls, theme_name: str) -> "Theme":
-        """Creates new theme object
+    def load_theme(cls, theme_name: str, headless: bool = False, 
+                   on_progress: Optional[Callable[[int, int], None]] = None,
+                   convert: bool = True) -> "Theme":
+        """Creates new theme object. Theme is read from its bundle if
+        there's one built from current theme files, see Theme.compile.
+        Otherwise sprites from LAZY_SPRITE_TYPES are loaded later
 
         Args:
             theme_name (str): Theme name. List of available themes can be get
             from Theme.get_available
+            headless (bool, optional): If True, images aren't loaded and 
+            sprites only know amount of their frames. Such theme doesn't
+            need display and is enough to run game logic. Defaults to False.
+            on_progress (Callable[[int, int], None], optional): Called with
+            amount of loaded and total images after every loaded image.
+            Defaults to None.
+            convert (bool, optional): If False, images are only decoded and 
+            aren't converted to display format. That doesn't touch display,
+            so it can be done in any thread, and then Theme.convert must be
+            called from main thread. Defaults to True.
         """
 
         theme_root = app.resource_path(os.path.join(Theme.PATH, theme_name))
-        if not os.path.exists(theme_root):
+        has_files = os.path.isdir(theme_root)
+
+        # Without theme files bundle is the only source of theme
+        content_hash = ThemeBundle.content_hash(theme_root) if has_files else None
+        converted = convert or headless
+        bundle = ThemeBundle.read(theme_root + ThemeBundle.EXTENSION, Theme.SPRITE_TYPES,
+                                  content_hash, headless, converted)
+        if bundle is not None:
+            sprites, atlas = bundle
+            if on_progress is not None:
+                on_progress(1, 1)
+            return cls(sprites, theme_name, atlas, headless, converted)
+
+        if not has_files:
             raise FileNotFoundError(f'Theme "{theme_name}" cannot be found')
 
-        sprites = {}
-        for sprite_type in Theme.SPRITE_TYPES:
+        sprite_types = [sprite_type for sprite_type in Theme.SPRITE_TYPES 
+                        if sprite_type not in Theme.LAZY_SPRITE_TYPES]
+        sprites, atlas = cls._load_sprites(theme_root, theme_name, sprite_types, headless, 
+                                           on_progress, converted)
+        return cls(sprites, theme_name, atlas, headless, converted)
+
+    @staticmethod
+    def _load_sprites(theme_root: str, theme_name: str, sprite_types: list[str], headless: bool = False,
+                      on_progress: Optional[Callable[[int, int], None]] = None, convert: bool = True
+                      ) -> tuple[dict[str, list[AnimatedSprite]], Optional[Atlas]]:
+        """ Loads sprites of given types from theme files. Images are 
+        decoded in parallel, then converted to display format one by one
+        in calling thread, unless convert is False
+        """
+
+        # Paths of images of every variation of every sprite
+        paths = {}
+        for sprite_type in sprite_types:
             sprite_path = os.path.join(theme_root, sprite_type)
             if not os.path.exists(sprite_path):
                 raise FileNotFoundError(
                     f'Sprite "{sprite_type}" doesn\'t exist in theme "{theme_name}"'
                 )
 
-            variations = Theme._load_sprite_variations(sprite_path, 
-                                                       Theme.SPRITE_TYPES[sprite_type])
-            sprites[sprite_type] = variations
+            sprite_class = Theme.SPRITE_TYPES[sprite_type]
+            paths[sprite_type] = [sprite_class.frame_paths(variation_path)
+                                  for variation_path in Theme._variation_paths(sprite_path)]
+
+        flat_paths = [path for variations in paths.values() 
+                      for lists in variations for frame_paths in lists for path in frame_paths]
+
+        images = []
+        if headless:
+            images = [AnimatedSprite.load_image(path, headless) for path in flat_paths]
+        else:
+            with ThreadPoolExecutor(Theme.DECODING_THREADS) as pool:
+                for image in pool.map(pygame.image.load, flat_paths):
+                    # Conversion needs display, so it's done in this thread
+                    images.append(image.convert_alpha() if convert else image)
+                    if on_progress is not None:
+                        on_progress(len(images), len(flat_paths))
+
+        loaded = iter(images)
+        sprites = {}
+        for sprite_type, variations in paths.items():
+            sprite_class = Theme.SPRITE_TYPES[sprite_type]
+            sprites[sprite_type] = [
+                sprite_class.from_images([[next(loaded) for _ in frame_paths] for frame_paths in lists])
+                for lists in variations
+            ]
+
+        # Frames of headless themes are empty, there's nothing to pack
+        atlas = None if headless else Theme._pack(sprites, convert)
+        return sprites, atlas
+
+    @classmethod
+    def compile(cls, theme_name: str) -> str:
+        """Builds bundle of theme from its files, so next time theme
+        loads without decoding images. Needs display mode to be set
+
+        Args:
+            theme_name (str): Theme name
+
+        Returns:
+            str: Path of bundle file
+        """
+
+        theme_root = app.resource_path(os.path.join(Theme.PATH, theme_name))
+        if not os.path.isdir(theme_root):
+            raise FileNotFoundError(f'Theme "{theme_name}" cannot be found')
 
-        return cls(sprites)
+        sprites, atlas = cls._load_sprites(theme_root, theme_name, list(Theme.SPRITE_TYPES))
+        path = theme_root + ThemeBundle.EXTENSION
+        ThemeBundle.write(path, sprites, atlas, ThemeBundle.content_hash(theme_root))
+        return path
 
     @staticmethod
     def get_available() -> list[str]:
-        """Returns list of themes from /themes folder"""
+        """Returns list of themes from /themes folder, 
+        including ones that have only bundle"""
 
-        return os.listdir(app.resource_path(Theme.PATH))
+        root = app.resource_path(Theme.PATH)
+        names = [entry for entry in os.listdir(root) if os.path.isdir(os.path.join(root, entry))]
+        for entry in os.listdir(root):
+            name, ext = os.path.splitext(entry)
+            if ext == ThemeBundle.EXTENSION and name not in names:
+                names.append(name)
+        return names
 
     @property
     def dot(self) -> list[SingleDirectionAnimatedSprite]:
-        return self._sprites.get("dot")
+        return self._sprite("dot")
 
     @property
     def enemy(self) -> list[FourDirectionAnimatedSprite]:
-        return self._sprites.get("enemy")
+        return self._sprite("enemy")
 
     @property
     def enemy_scare(self) -> list[FourDirectionAnimatedSprite]:
-        return self._sprites.get("enemy_scare")
+        return self._sprite("enemy_scare")
 
     @property
     def energizer(self) -> list[SingleDirectionAnimatedSprite]:
-        return self._sprites.get("energizer")
+        return self._sprite("energizer")
 
     @property
     def floor(self) -> list[SingleDirectionAnimatedSprite]:
-        return self._sprites.get("floor")
+        return self._sprite("floor")
 
     @property
     def fruit(self) -> list[SingleDirectionAnimatedSprite]:
-        return self._sprites.get("fruit")
+        return self._sprite("fruit")
 
     @property
     def ghost_box_exit(self) -> list[TwoDirectionAnimatedSprite]:
-        return self._sprites.get("ghost_box_exit")
+        return self._sprite("ghost_box_exit")
 
     @property
     def player(self) -> list[FourDirectionAnimatedSprite]:
-        return self._sprites.get("player")
+        return self._sprite("player")
 
     @property
     def wall(self) -> list[SingleDirectionAnimatedSprite]:
-        return self._sprites.get("wall")
+        return self._sprite("wall")
 
     @property
     def life(self) -> list[SingleDirectionAnimatedSprite]:
-        return self._sprites.get("life")
\ No newline at end of file
+        return self._sprite("life")
\ No newline at end of file
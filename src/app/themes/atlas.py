@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import pygame
+
+
+class Atlas:
+    """ Packs many small images into a few big surfaces (pages).
+    Images are placed on shelves: rows as high as the highest image
+    in them. Images are handed out as subsurfaces of pages, so they
+    can be used like any other surface
+    """
+
+    PAGE_WIDTH = 2048
+    MAX_PAGE_HEIGHT = 2048
+
+    def __init__(self, pages: list[pygame.Surface], frames: list[pygame.Surface]):
+        """
+        Args:
+            pages (list[pygame.Surface]): Big surfaces with images
+            frames (list[pygame.Surface]): Subsurfaces of pages, one per image
+        """
+
+        self.pages = pages
+        self.frames = frames
+
+    @classmethod
+    def pack(cls, images: list[pygame.Surface], convert: bool = True) -> Atlas:
+        """ Packs images. Packed copies are in frames of atlas, in the same order
+
+        Args:
+            images (list[pygame.Surface]): Images to pack
+            convert (bool, optional): If False, pages aren't converted
+            to display format, see Atlas.converted. Defaults to True.
+        """
+
+        # Higher images first, so shelves waste less space
+        order = sorted(range(len(images)), key=lambda idx: images[idx].get_height(), reverse=True)
+        placements = cls._place([images[idx].get_size() for idx in order])
+
+        page_sizes = {}
+        for page, x, y, w, h in placements:
+            page_w, page_h = page_sizes.get(page, (0, 0))
+            page_sizes[page] = max(page_w, x + w), max(page_h, y + h)
+
+        pages = []
+        for page in range(len(page_sizes)):
+            surface = pygame.Surface(page_sizes[page], pygame.SRCALPHA)
+            if convert:
+                surface = surface.convert_alpha()
+            surface.fill((0, 0, 0, 0))
+            pages.append(surface)
+
+        frames = [None] * len(images)
+        for idx, (page, x, y, w, h) in zip(order, placements):
+            pages[page].blit(images[idx], (x, y))
+            frames[idx] = pages[page].subsurface((x, y, w, h))
+
+        return cls(pages, frames)
+
+    def extend(self, other: Atlas) -> None:
+        """ Takes pages and frames of other atlas """
+        self.pages += other.pages
+        self.frames += other.frames
+
+    def converted(self) -> tuple[Atlas, dict[int, pygame.Surface]]:
+        """ Makes copy of atlas with pages converted to display format.
+        Needs display mode to be set
+
+        Returns:
+            tuple[Atlas, dict[int, pygame.Surface]]: New atlas and its
+            frames by id of the same frames of this atlas
+        """
+
+        pages = [page.convert_alpha() for page in self.pages]
+        moved = {}
+        for frame in self.frames:
+            page, x, y, w, h = self.locate(frame)
+            moved[id(frame)] = pages[page].subsurface((x, y, w, h))
+        return Atlas(pages, [moved[id(frame)] for frame in self.frames]), moved
+
+    def locate(self, frame: pygame.Surface) -> tuple[int, int, int, int, int]:
+        """ Returns page, x, y, width and height of packed frame """
+
+        parent = frame.get_parent()
+        page = next(idx for idx, surface in enumerate(self.pages) if surface is parent)
+        return (page,) + frame.get_offset() + frame.get_size()
+
+    @staticmethod
+    def _place(sizes: list[tuple[int, int]]) -> list[tuple[int, int, int, int, int]]:
+        """ Finds place for every image, images must be sorted by height
+
+        Returns:
+            list[tuple[int, int, int, int, int]]: Page, x, y, width and height of every image
+        """
+
+        placements = []
+        page = x = y = shelf_height = 0
+        for w, h in sizes:
+            if w > Atlas.PAGE_WIDTH or h > Atlas.MAX_PAGE_HEIGHT:
+                raise ValueError(f'Image of size {w}x{h} doesn\'t fit into atlas page')
+
+            # Start new shelf, or new page if there's no room for it
+            if x + w > Atlas.PAGE_WIDTH:
+                x, y = 0, y + shelf_height
+                shelf_height = 0
+            if y + h > Atlas.MAX_PAGE_HEIGHT:
+                page, x, y = page + 1, 0, 0
+                shelf_height = 0
+
+            placements.append((page, x, y, w, h))
+            x += w
+            shelf_height = max(shelf_height, h)
+
+        return placements
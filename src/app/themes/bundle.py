@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import struct
+import pygame
+from typing import Optional
+from app.themes.atlas import Atlas
+from app.themes.sprite import AnimatedSprite
+
+
+class ThemeBundle:
+    """ Theme compiled into single file: raw pixels of atlas pages
+    and index telling where every frame of every sprite is, so
+    loading bundle only copies pixels.
+    Bundle remembers hash of theme files it was built from and is
+    ignored once they change
+    """
+
+    EXTENSION = '.bundle'
+    FILE_SIGNATURE = b'PMTHM2'
+
+    # Hash of theme files and length of index
+    HEADER = struct.Struct('<20sI')
+
+    PIXEL_FORMAT = 'RGBA'
+
+    @staticmethod
+    def content_hash(theme_root: str) -> bytes:
+        """ Hash of names and contents of all files of the theme """
+
+        files = []
+        for root, _, names in os.walk(theme_root):
+            for name in names:
+                path = os.path.join(root, name)
+                files.append((os.path.relpath(path, theme_root).replace(os.sep, '/'), path))
+
+        digest = hashlib.sha1()
+        for name, path in sorted(files):
+            with open(path, 'rb') as f:
+                content = f.read()
+            digest.update(f'{name}:{len(content)}:'.encode())
+            digest.update(content)
+        return digest.digest()
+
+    @classmethod
+    def write(cls, path: str, sprites: dict[str, list[AnimatedSprite]],
+              atlas: Atlas, content_hash: bytes) -> None:
+        """ Writes sprites loaded from theme files to bundle
+
+        Args:
+            path (str): Path of bundle file
+            sprites (dict[str, list[AnimatedSprite]]): Variations of every sprite
+            atlas (Atlas): Atlas with frames of all sprites
+            content_hash (bytes): Hash of files sprites were loaded from
+        """
+
+        index_sprites = {}
+        for sprite_type, variations in sprites.items():
+            index_sprites[sprite_type] = [{
+                'counts': sprite.frame_counts(),
+                'frames': [atlas.locate(frame) for frame in sprite.surfaces()],
+            } for sprite in variations]
+
+        index = json.dumps({
+            'pages': [page.get_size() for page in atlas.pages],
+            'sprites': index_sprites,
+        }).encode()
+
+        # Written under temporary name, so unfinished bundle is never read
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(cls.FILE_SIGNATURE)
+            f.write(cls.HEADER.pack(content_hash, len(index)))
+            f.write(index)
+            for page in atlas.pages:
+                f.write(pygame.image.tobytes(page, cls.PIXEL_FORMAT))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def read(cls, path: str, sprite_types: dict[str, type[AnimatedSprite]],
+             content_hash: Optional[bytes] = None, headless: bool = False,
+             convert: bool = True) -> Optional[tuple[dict[str, list[AnimatedSprite]], Optional[Atlas]]]:
+        """ Reads bundle with single read
+
+        Args:
+            path (str): Path of bundle file
+            sprite_types (dict[str, type[AnimatedSprite]]): Class of every sprite
+            content_hash (bytes, optional): Hash of current theme files.
+            If given and doesn't match, bundle is outdated. Defaults to None.
+            headless (bool, optional): If True, pixels aren't read, like
+            in Theme.load_theme. Defaults to False.
+            convert (bool, optional): If False, pages aren't converted 
+            to display format, like in Theme.load_theme. Defaults to True.
+
+        Returns:
+            Sprites and atlas with their frames, or None
+            if bundle is missing, outdated or broken
+        """
+
+        try:
+            with open(path, 'rb') as f:
+                data = memoryview(f.read())
+        except OSError:
+            return None
+
+        start = len(cls.FILE_SIGNATURE)
+        if data[:start] != cls.FILE_SIGNATURE or len(data) < start + cls.HEADER.size:
+            return None
+        bundle_hash, index_size = cls.HEADER.unpack_from(data, start)
+        if content_hash is not None and bundle_hash != content_hash:
+            return None
+
+        start += cls.HEADER.size
+        try:
+            index = json.loads(bytes(data[start:start + index_size]))
+        except ValueError:
+            return None
+        if set(index['sprites']) != set(sprite_types):
+            return None
+
+        # Pixels aren't copied from file data until they are converted
+        atlas = None
+        if not headless:
+            pages = []
+            start += index_size
+            for w, h in index['pages']:
+                size = w * h * len(cls.PIXEL_FORMAT)
+                if start + size > len(data):
+                    return None
+                page = pygame.image.frombuffer(data[start:start + size], (w, h), cls.PIXEL_FORMAT)
+                pages.append(page.convert_alpha() if convert else page)
+                start += size
+            atlas = Atlas(pages, [])
+
+        sprites = {}
+        for sprite_type, variations in index['sprites'].items():
+            sprites[sprite_type] = []
+            for variation in variations:
+                if headless:
+                    frames = [pygame.Surface(AnimatedSprite.HEADLESS_FRAME_SIZE)
+                              for _ in variation['frames']]
+                else:
+                    frames = [atlas.pages[page].subsurface((x, y, w, h))
+                              for page, x, y, w, h in variation['frames']]
+                    atlas.frames += frames
+
+                frame_lists, first = [], 0
+                for count in variation['counts']:
+                    frame_lists.append(frames[first:first + count])
+                    first += count
+                sprites[sprite_type].append(sprite_types[sprite_type].from_images(frame_lists))
+
+        return sprites, atlas
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import pygame
+from app.surface_cache import SurfaceCache
+
+
+class FlipCache(SurfaceCache):
+    """ Horizontally flipped copies of frames, made on first request """
+
+    BUDGET_BYTES = 16 * 1024 * 1024
+
+    def __init__(self, budget_bytes: int = BUDGET_BYTES):
+        super().__init__(budget_bytes)
+
+    def get(self, frame: pygame.Surface) -> pygame.Surface:
+        """ Returns frame flipped horizontally """
+        return super().get(frame, lambda: pygame.transform.flip(frame, True, False))
+
+    def __str__(self) -> str:
+        return f'flipped frames: {self.stats()}'
@@ -1,19 +1,24 @@
+from __future__ import annotations
+
 import pygame
 import os
 
 from abc import ABC, abstractmethod
+from typing import Iterator
+from app.themes.flip_cache import FlipCache
 from utilities.direction import Direction
 
 
 class AnimatedSprite(ABC):
-    FRAMES_CHANGED_PER_SECOND = 12
-
     def __init__(self):
-        self._since_last_frame_change = 0
         self.amount = 0
 
+    # Frames of sprites loaded without display. Only amount 
+    # of frames matters for game logic, so images aren't decoded
+    HEADLESS_FRAME_SIZE = 1, 1
+
     @staticmethod
-    def _load(sprite_path) -> list[pygame.Surface]:
+    def _frame_paths(sprite_path) -> list[str]:
         if not os.path.exists(sprite_path):
             raise FileNotFoundError(f"Path {sprite_path} doesn't exist")
 
@@ -21,8 +26,7 @@ class AnimatedSprite(ABC):
         i = 0
         frame_path = os.path.join(sprite_path, f"{i}.png")
         while os.path.exists(frame_path):
-            img = pygame.image.load(frame_path).convert_alpha()
-            frames.append(img)
+            frames.append(frame_path)
             
             i += 1
             frame_path = os.path.join(sprite_path, f"{i}.png")
@@ -34,19 +38,62 @@ class AnimatedSprite(ABC):
 
         return frames
 
+    @staticmethod
+    def load_image(frame_path, headless: bool = False) -> pygame.Surface:
+        if headless:
+            return pygame.Surface(AnimatedSprite.HEADLESS_FRAME_SIZE)
+        return pygame.image.load(frame_path).convert_alpha()
+
+    @classmethod
     @abstractmethod
-    def frame(self, idx) -> pygame.Surface:
+    def frame_paths(cls, sprite_path) -> list[list[str]]:
+        """ Returns paths of images for every argument of from_images """
         pass
 
     @classmethod
     @abstractmethod
-    def load(cls, sprite_path) -> None:
+    def from_images(cls, images: list[list[pygame.Surface]]) -> AnimatedSprite:
+        """ Creates sprite from images found at paths returned by frame_paths """
+        pass
+
+    @classmethod
+    def load(cls, sprite_path, headless: bool = False) -> AnimatedSprite:
+        return cls.from_images([[cls.load_image(path, headless) for path in paths] 
+                                for paths in cls.frame_paths(sprite_path)])
+
+    # Names of attributes with lists of frames. Flipped
+    # frames aren't stored, they are made by flipped_frames
+    FRAME_LISTS = ()
+
+    # Shared by all sprites, so budget covers the whole theme
+    flipped_frames = FlipCache()
+
+    @abstractmethod
+    def frame(self, idx) -> pygame.Surface:
         pass
 
+    def surfaces(self) -> list[pygame.Surface]:
+        """ Returns all frames of sprite, in order of FRAME_LISTS """
+        return [img for name in self.FRAME_LISTS for img in getattr(self, name)]
+
+    def replace_surfaces(self, surfaces: Iterator[pygame.Surface]) -> None:
+        """ Replaces every frame with the next one from iterator,
+        in the same order they are returned by surfaces()
+        """
+
+        for name in self.FRAME_LISTS:
+            setattr(self, name, [next(surfaces) for _ in getattr(self, name)])
+
+    def frame_counts(self) -> list[int]:
+        """ Returns length of every list of frames, in order of FRAME_LISTS """
+        return [len(getattr(self, name)) for name in self.FRAME_LISTS]
+
 
 class SingleDirectionAnimatedSprite(AnimatedSprite):
     """ Represents game sprite """
 
+    FRAME_LISTS = '_frames',
+
     def __init__(self, frames: list[pygame.Surface]):
         super().__init__()
         self._frames = frames
@@ -65,19 +112,21 @@ class SingleDirectionAnimatedSprite(AnimatedSprite):
         return self._frames[idx]
 
     @classmethod
-    def load(cls, sprite_path) -> "SingleDirectionAnimatedSprite":
-        frames = cls._load(sprite_path)
-        return cls(frames)
+    def frame_paths(cls, sprite_path) -> list[list[str]]:
+        return [cls._frame_paths(sprite_path)]
+
+    @classmethod
+    def from_images(cls, images: list[list[pygame.Surface]]) -> "SingleDirectionAnimatedSprite":
+        return cls(images[0])
 
 
 class TwoDirectionAnimatedSprite(AnimatedSprite):
+    FRAME_LISTS = '_frames',
+
     def __init__(self, frames: list[pygame.Surface]):
         super().__init__()
 
         self._frames = frames
-        self._rev_frames = [pygame.transform.flip(img, True, False)
-                            for img in frames]
-
         self.amount = len(frames)
 
     def frame(self, 
@@ -94,15 +143,20 @@ class TwoDirectionAnimatedSprite(AnimatedSprite):
             pygame.Surface: surface containing current frame image
         """
 
-        return self._frames[idx] if not reversed_ else self._rev_frames[idx]
+        return self._frames[idx] if not reversed_ else AnimatedSprite.flipped_frames.get(self._frames[idx])
+
+    @classmethod
+    def frame_paths(cls, sprite_path) -> list[list[str]]:
+        return [cls._frame_paths(sprite_path)]
 
     @classmethod
-    def load(cls, sprite_path) -> 'TwoDirectionAnimatedSprite':
-        frames = cls._load(sprite_path)
-        return cls(frames)
+    def from_images(cls, images: list[list[pygame.Surface]]) -> 'TwoDirectionAnimatedSprite':
+        return cls(images[0])
 
 
 class FourDirectionAnimatedSprite(AnimatedSprite):
+    FRAME_LISTS = '_W_frames', '_N_frames'
+
     def __init__(self, 
                  fwd_frames: list[pygame.Surface], 
                  bwd_frames: list[pygame.Surface]):
@@ -111,12 +165,10 @@ class FourDirectionAnimatedSprite(AnimatedSprite):
         if (len(fwd_frames) != len(bwd_frames)):
             raise ValueError("Amount of forward and backward frames doesn't match")
         
+        # Sprites looking south and east are flipped ones
+        # looking west and north respectively
         self._W_frames = fwd_frames
-        self._S_frames = [pygame.transform.flip(img, True, False) 
-                              for img in fwd_frames]
         self._N_frames = bwd_frames
-        self._E_frames = [pygame.transform.flip(img, True, False) 
-                              for img in bwd_frames]
 
         self.amount = len(fwd_frames)
 
@@ -137,9 +189,9 @@ class FourDirectionAnimatedSprite(AnimatedSprite):
         if direction == Direction.N:
             current_frame = self._N_frames[idx]
         elif direction == Direction.E:
-            current_frame = self._E_frames[idx]
+            current_frame = AnimatedSprite.flipped_frames.get(self._N_frames[idx])
         elif direction == Direction.S:
-            current_frame = self._S_frames[idx]
+            current_frame = AnimatedSprite.flipped_frames.get(self._W_frames[idx])
         elif direction == Direction.W:
             current_frame = self._W_frames[idx]
         else:
@@ -148,11 +200,12 @@ class FourDirectionAnimatedSprite(AnimatedSprite):
         return current_frame
 
     @classmethod
-    def load(cls, sprite_path) -> 'FourDirectionAnimatedSprite':
+    def frame_paths(cls, sprite_path) -> list[list[str]]:
         fwd_path = os.path.join(sprite_path, 'forward')
-        fwd_frames = cls._load(fwd_path)
-
         bwd_path = os.path.join(sprite_path, 'backward')
-        bwd_frames = cls._load(bwd_path)
+        return [cls._frame_paths(fwd_path), cls._frame_paths(bwd_path)]
 
+    @classmethod
+    def from_images(cls, images: list[list[pygame.Surface]]) -> 'FourDirectionAnimatedSprite':
+        fwd_frames, bwd_frames = images
         return cls(fwd_frames, bwd_frames)
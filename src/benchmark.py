@@ -0,0 +1,64 @@
+import os
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
+
+# Numbers should be comparable between machines, so
+# nothing is ever shown on the real display
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+
+import argparse
+import json
+import platform
+import sys
+import pygame
+pygame.init()
+
+from app import App
+from benchmarks.cases import BenchmarkSuite
+
+
+def environment() -> dict:
+    return {
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'sdl': '.'.join(map(str, pygame.get_sdl_version())),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'video_driver': pygame.display.get_driver(),
+        'screen_size': list(App.DEFAULT_SIZE),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Times the hottest parts of the game')
+    parser.add_argument('--sizes', default='1,2,4',
+                        help='comma separated list of how many times classic maze is repeated along each side')
+    parser.add_argument('--generated', default='',
+                        help='comma separated list of sides of square random mazes, e.g. 100,300')
+    parser.add_argument('--scale', type=float, default=1.0, help='multiplier of amount of samples')
+    parser.add_argument('--seed', type=int, default=0, help='seed of games and random positions')
+    parser.add_argument('--output', help='path of JSON file with results, printed to stdout if not given')
+    args = parser.parse_args()
+
+    app = App()
+    app.theme = app.state.loader.wait()
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    generated_sizes = [int(size) for size in args.generated.split(',') if size]
+    suite = BenchmarkSuite(app, sizes, generated_sizes, args.seed, args.scale)
+
+    results = []
+    for measurement in suite.run():
+        result = measurement.as_dict()
+        results.append(result)
+        print(f'{result["name"]:<32} {result["maze"]:<16} '
+              f'p50 {result["p50"]:>10.1f} us   p99 {result["p99"]:>10.1f} us', file=sys.stderr)
+
+    report = json.dumps({'environment': environment(), 'seed': args.seed, 'results': results}, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from time import perf_counter_ns
+from typing import Callable, Optional
+
+
+class Measurement:
+    """ Timings of many calls of the same piece of code """
+
+    PERCENTILES = 50, 90, 95, 99
+
+    def __init__(self, name: str, maze: str, samples: list[int]):
+        """
+        Args:
+            name (str): What was measured
+            maze (str): Maze it was measured on
+            samples (list[int]): Duration of every call in nanoseconds
+        """
+
+        self.name = name
+        self.maze = maze
+        self.samples = sorted(samples)
+
+    def percentile(self, p: float) -> float:
+        """ Duration in microseconds which p percents of calls didn't exceed """
+
+        idx = min(len(self.samples) - 1, int(len(self.samples) * p / 100))
+        return self.samples[idx] / 1000
+
+    @property
+    def mean(self) -> float:
+        return sum(self.samples) / len(self.samples) / 1000
+
+    def as_dict(self) -> dict:
+        result = {
+            'name': self.name,
+            'maze': self.maze,
+            'samples': len(self.samples),
+            'unit': 'us',
+            'min': self.samples[0] / 1000,
+            'mean': self.mean,
+            'max': self.samples[-1] / 1000,
+        }
+        for p in Measurement.PERCENTILES:
+            result[f'p{p}'] = self.percentile(p)
+        return result
+
+
+def measure(name: str, maze: str, fn: Callable[[], object], samples: int,
+            setup: Optional[Callable[[], object]] = None, warmup: int = 0) -> Measurement:
+    """ Calls fn given amount of times and times every call
+
+    Args:
+        name (str): What is measured
+        maze (str): Maze it is measured on
+        fn (Callable[[], object]): Code to measure
+        samples (int): Amount of timed calls
+        setup (Callable[[], object], optional): Is called before every
+        call of fn and isn't timed. Defaults to None.
+        warmup (int, optional): Amount of untimed calls made first,
+        so caches are filled. Defaults to 0.
+    """
+
+    for _ in range(warmup):
+        if setup is not None:
+            setup()
+        fn()
+
+    timings = []
+    for _ in range(samples):
+        if setup is not None:
+            setup()
+        start = perf_counter_ns()
+        fn()
+        timings.append(perf_counter_ns() - start)
+
+    return Measurement(name, maze, timings)
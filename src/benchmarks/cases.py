@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import itertools
+import os
+import random
+from typing import TYPE_CHECKING, Iterator
+from app.states.game import Game
+from app.states.game.maze import CellFlag, Maze
+from app.states.game.maze_generator import MazeGenerator
+from app.themes import Theme
+from benchmarks import Measurement, measure
+from benchmarks.mazes import tiled_grid
+
+if TYPE_CHECKING:
+    from app import App
+
+
+class BenchmarkSuite:
+    """ Times the hottest parts of the game on the classic level
+    and on bigger mazes made of its copies. Cells are no longer drawn
+    one by one, so drawing of cells is measured as baking of static
+    layer chunks and as patching them once collectibles are eaten.
+    Collisions are measured as queries to the collision grid
+    """
+
+    LEVEL_NAME = 'classic.csv'
+
+    # Amount of timed calls for every kind of benchmark, multiplied by scale
+    SAMPLES = {
+        'theme': 3,
+        'validate': 20,
+        'draw': 100,
+        'call': 2000,
+    }
+
+    # Pacman changes cell once in this amount of pathfinding calls
+    CALLS_PER_PACMAN_MOVE = 30
+
+    def __init__(self, app: App, sizes: list[int], generated_sizes: list[int] = (), 
+                 seed: int = 0, scale: float = 1.0):
+        """
+        Args:
+            app (App): Application with display to draw on
+            sizes (list[int]): Maze is repeated size x size times for every size
+            generated_sizes (list[int], optional): Sides of square random mazes
+            to measure on too. Defaults to none.
+            seed (int, optional): Seed of games, mazes and random positions. Defaults to 0.
+            scale (float, optional): Multiplier of amount of samples. Defaults to 1.0.
+        """
+
+        self.app = app
+        self.sizes = sizes
+        self.generated_sizes = generated_sizes
+        self.seed = seed
+        self.scale = scale
+
+    def samples(self, kind: str) -> int:
+        return max(1, round(BenchmarkSuite.SAMPLES[kind] * self.scale))
+
+    def mazes(self) -> Iterator[tuple[str, list[list[int]]]]:
+        level = os.path.splitext(BenchmarkSuite.LEVEL_NAME)[0]
+        for size in self.sizes:
+            yield f'{level}-{size}x{size}', tiled_grid(BenchmarkSuite.LEVEL_NAME, size)
+
+        for size in self.generated_sizes:
+            yield f'generated-{size}x{size}', MazeGenerator(size, size, self.seed).generate()
+
+    def run(self) -> Iterator[Measurement]:
+        yield self.bench_load_theme()
+
+        for maze_name, grid in self.mazes():
+            game = Game(self.app, seed=self.seed, grid=grid)
+            self.app.state = game
+
+            yield self.bench_validate(game, maze_name)
+            yield self.bench_draw(game, maze_name)
+            yield self.bench_bake(game, maze_name)
+            yield self.bench_patch(game, maze_name)
+            yield from self.bench_get_direction(game, maze_name)
+            yield self.bench_collisions(game, maze_name)
+
+    def bench_load_theme(self) -> Measurement:
+        theme_name = self.app.theme.name
+        return measure('Theme.load_theme', '-', lambda: Theme.load_theme(theme_name),
+                       self.samples('theme'))
+
+    def bench_validate(self, game: Game, maze_name: str) -> Measurement:
+        return measure('Maze._validate', maze_name, game.maze._validate,
+                       self.samples('validate'))
+
+    def bench_draw(self, game: Game, maze_name: str) -> Measurement:
+        return measure('Game.draw', maze_name, game.draw,
+                       self.samples('draw'), warmup=10)
+
+    def bench_bake(self, game: Game, maze_name: str) -> Measurement:
+        layer = game.static_layer
+        chunks = itertools.cycle(layer.visible_chunks())
+        return measure('StaticLayer._bake', maze_name, lambda: layer._bake(next(chunks), 0),
+                       self.samples('draw'))
+
+    def bench_patch(self, game: Game, maze_name: str) -> Measurement:
+        # Only chunks already baked are patched, so cells are taken from visible ones
+        layer = game.static_layer
+        layer.draw()
+        cells = []
+        for chunk in layer.visible_chunks():
+            x0, y0, x1, y1 = layer._chunk_cells(chunk)
+            cells += [(x, y) for y in range(y0, y1 + 1) for x in range(x0, x1 + 1)]
+        cells = itertools.cycle(cells)
+        return measure('StaticLayer.patch', maze_name, lambda: layer.patch(next(cells)),
+                       self.samples('call'))
+
+    def _walkable_cells(self, maze: Maze) -> list[tuple[int, int]]:
+        return [(idx % maze.width_in_cells, idx // maze.width_in_cells)
+                for idx, n in enumerate(maze.cells) if not n & CellFlag.WALL]
+
+    def bench_get_direction(self, game: Game, maze_name: str) -> Iterator[Measurement]:
+        rng = random.Random(self.seed)
+        walkable = self._walkable_cells(game.maze)
+
+        for ghost in list(game.ghosts):
+            calls = 0
+
+            def setup():
+                nonlocal calls
+                if calls % BenchmarkSuite.CALLS_PER_PACMAN_MOVE == 0:
+                    game.pacman.cell = rng.choice(walkable)
+                ghost.cell = rng.choice(walkable)
+                calls += 1
+
+            yield measure(f'{type(ghost).__name__}.get_direction', maze_name, ghost.get_direction,
+                          self.samples('call'), setup=setup)
+
+    def bench_collisions(self, game: Game, maze_name: str) -> Measurement:
+        rng = random.Random(self.seed)
+        pacman = game.pacman
+        walkable = self._walkable_cells(game.maze)
+
+        def setup():
+            # Ghosts are mostly in different parts of the
+            # maze, but sometimes right next to pacman
+            pacman.mz_position = rng.choice(walkable)
+            for ghost in game.ghosts:
+                if rng.random() < 0.5:
+                    ghost.mz_position = rng.choice(walkable)
+                else:
+                    ghost.mz_position = pacman.mz_position[0] + rng.uniform(-1, 1), pacman.mz_position[1]
+                ghost.direction = rng.randrange(4)
+            pacman.direction = rng.randrange(4)
+
+        def collide():
+            game.collisions.rebuild(game.ghosts)
+            return game.collisions.touching(pacman)
+
+        return measure('CollisionGrid.touching', maze_name, collide,
+                       self.samples('call'), setup=setup)
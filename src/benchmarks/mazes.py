@@ -0,0 +1,41 @@
+from app.states.game.maze import CellFlag, Maze
+
+SCATTER_GOALS = CellFlag.BLINKY_SCATTER_GOAL | CellFlag.PINKY_SCATTER_GOAL | \
+                CellFlag.INKY_SCATTER_GOAL | CellFlag.CLYDE_SCATTER_GOAL
+
+
+def tiled_grid(level_name: str, factor: int) -> list[list[int]]:
+    """ Builds bigger maze by repeating level factor x factor times.
+    Tiles are joined through their side tunnels and through gaps cut in
+    horizontal borders, so the whole maze stays connected
+
+    Args:
+        level_name (str): Level file to repeat
+        factor (int): Amount of copies along each side
+
+    Returns:
+        list[list[int]]: Layout in the format of level files
+    """
+
+    tile = Maze._load_level_csv(level_name)
+    tile_h, tile_w = len(tile), len(tile[0])
+
+    grid = [row * factor for _ in range(factor) for row in tile]
+
+    # Only the first tile keeps scatter goals, as there can be only one of each
+    for y in range(len(grid)):
+        for x in range(len(grid[0])):
+            if y >= tile_h or x >= tile_w:
+                grid[y][x] &= ~SCATTER_GOALS
+
+    # Cut borders between vertically adjacent tiles next to their 
+    # side walls, where cells on both sides of borders are walkable
+    for tile_y in range(1, factor):
+        top, bottom = tile_y * tile_h - 1, tile_y * tile_h
+        for x in range(len(grid[0])):
+            if x % tile_w not in (1, tile_w - 2):
+                continue
+            if not grid[top - 1][x] & CellFlag.WALL and not grid[bottom + 1][x] & CellFlag.WALL:
+                grid[top][x] = grid[bottom][x] = 0
+
+    return grid
@@ -0,0 +1,28 @@
+import os 
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
+
+# Images are converted to display format, but nothing is ever shown
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+
+import argparse
+import time
+import pygame
+pygame.init()
+pygame.display.set_mode((1, 1))
+
+from app.themes import Theme
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compiles themes into bundles that load without decoding images')
+    parser.add_argument('themes', nargs='*', help='names of themes to compile, all themes if none given')
+    args = parser.parse_args()
+
+    for theme_name in args.themes or Theme.get_available():
+        start = time.perf_counter()
+        path = Theme.compile(theme_name)
+        print(f'Theme "{theme_name}" compiled to {path} in {time.perf_counter() - start:.2f} s')
+
+
+if __name__ == "__main__":
+    main()
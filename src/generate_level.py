@@ -0,0 +1,28 @@
+import os 
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
+
+import argparse
+import time
+import pygame
+pygame.font.init()
+
+from app.states.game.maze_generator import MazeGenerator
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Creates random level file')
+    parser.add_argument('width', type=int, help='width of the maze in cells')
+    parser.add_argument('height', type=int, help='height of the maze in cells')
+    parser.add_argument('output', help='path of CSV file to write, e.g. levels/big.csv')
+    parser.add_argument('--seed', type=int, help='same seed always gives the same level')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    grid = MazeGenerator(args.width, args.height, args.seed).generate()
+    MazeGenerator.write_csv(grid, args.output)
+    print(f'{args.width}x{args.height} level written to {args.output} '
+          f'in {time.perf_counter() - start:.2f} s')
+
+
+if __name__ == "__main__":
+    main()
@@ -12,12 +12,12 @@ def main():
     app = App()
 
     while app.running:
-        clock.tick(app.FPS)
+        seconds = clock.tick(app.FPS) / 1000
 
         for event in pygame.event.get():
             app.handle_event(event)
 
-        app.update()
+        app.advance(seconds)
         app.draw()
 
 
@@ -0,0 +1,73 @@
+import os 
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
+
+import argparse
+import sys
+import pygame
+pygame.font.init()
+
+from time import perf_counter
+from app.simulation.batch import BatchJob, BatchResults, parameter_grid, run_batch
+from app.simulation.replay import play_replay
+from app.states.game.replay import Replay
+from app.themes import Theme
+
+
+def parse_param(text: str) -> tuple[str, list[float]]:
+    name, _, values = text.partition('=')
+    return name, [float(value) for value in values.split(',')]
+
+
+def replay(path: str):
+    recorded = Replay.load(path)
+    result, matches = play_replay(recorded)
+    print(f'{result.ticks} ticks in {result.seconds:.2f} s ({result.ticks_per_second:.0f} ticks/s), '
+          f'score {result.score}, levels cleared {result.levels_cleared}')
+
+    if not matches:
+        print('Replay diverged from recorded session')
+        sys.exit(1)
+    print('Replay matches recorded session')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Runs games without display as fast as possible')
+    parser.add_argument('--games', type=int, default=1, help='amount of games for each set of parameters')
+    parser.add_argument('--max-ticks', type=int, default=60 * 60 * 10, help='limit of ticks for each game')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first game')
+    parser.add_argument('--theme', default=Theme.get_available()[0], help='theme to take sprite metadata from')
+    parser.add_argument('--level', default='classic.csv', help='level file from levels folder to play on')
+    parser.add_argument('--workers', type=int, default=1, help='amount of processes running games')
+    parser.add_argument('--param', action='append', default=[], type=parse_param, 
+                        metavar='NAME=V1,V2', help='values of game constant to try, e.g. Blinky.SECONDS_FOR_CELL=0.4,0.5')
+    parser.add_argument('--output', help='path of CSV file with results of every game')
+    parser.add_argument('--replay', help='play recorded session and check that it goes the same way')
+    args = parser.parse_args()
+
+    if args.replay:
+        replay(args.replay)
+        return
+
+    parameters = dict(args.param)
+    jobs = [BatchJob(seed, values, args.max_ticks) 
+            for values in parameter_grid(parameters)
+            for seed in range(args.seed, args.seed + args.games)]
+
+    results = BatchResults(list(parameters))
+    start = perf_counter()
+    for row in run_batch(jobs, args.workers, args.theme, args.level):
+        results.add(row)
+        print(', '.join(f'{column}={row[column]}' for column in results.columns) + 
+              f', ticks/s={row["ticks_per_second"]:.0f}')
+    seconds = perf_counter() - start
+
+    total_ticks = sum(results.data['ticks'])
+    print(f'{len(results)} games, {total_ticks} ticks, {total_ticks / seconds:.0f} ticks/s, '
+          f'mean score {results.mean("score"):.1f}')
+
+    if args.output:
+        results.write_csv(args.output)
+
+
+if __name__ == "__main__":
+    main()
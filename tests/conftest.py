@@ -0,0 +1,36 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+import pytest
+
+# Fonts are created when app modules are imported
+pygame.init()
+
+from app.simulation import HeadlessApp
+from app.states.game.navigation import NavigationTable
+from app.themes import Theme
+
+
+@pytest.fixture(autouse=True)
+def resources(monkeypatch, tmp_path):
+    # Levels and themes are looked up relative to working directory,
+    # navigation tables built by tests are cached outside of the repo
+    monkeypatch.chdir(ROOT)
+    monkeypatch.setattr(NavigationTable, 'CACHE_PATH', str(tmp_path / 'cache'))
+
+
+@pytest.fixture(scope='session')
+def theme() -> Theme:
+    os.chdir(ROOT)
+    return Theme.load_theme(Theme.get_available()[0], headless=True)
+
+
+@pytest.fixture
+def app(theme) -> HeadlessApp:
+    return HeadlessApp(theme, lambda game, tick: None, seed=0)
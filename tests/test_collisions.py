@@ -0,0 +1,49 @@
+import random
+
+from app.states.game.collisions import CollisionGrid
+
+
+def brute_force(creatures, creature):
+    min_x, min_y, max_x, max_y = CollisionGrid.box(creature)
+    touched = []
+    for other in creatures:
+        other_min_x, other_min_y, other_max_x, other_max_y = CollisionGrid.box(other)
+        if other is not creature and other_min_x <= max_x and min_x <= other_max_x and \
+           other_min_y <= max_y and min_y <= other_max_y:
+            touched.append(other)
+    return touched
+
+
+def test_grid_agrees_with_brute_force(app):
+    game = app.state
+    pacman, ghosts = game.pacman, game.ghosts
+    grid = CollisionGrid()
+    rng = random.Random(0)
+    hits = 0
+
+    for _ in range(5000):
+        # Creatures are put close to each other, so most of them touch
+        x, y = rng.uniform(0, 10), rng.uniform(0, 10)
+        for creature in [pacman] + ghosts:
+            creature.mz_position = x + rng.uniform(-2, 2), y + rng.uniform(-2, 2)
+            if rng.random() < 0.5:
+                creature.mz_position = round(creature.mz_position[0]), creature.mz_position[1]
+            creature.direction = rng.randrange(4)
+
+        grid.rebuild(ghosts)
+        touched = grid.touching(pacman)
+        assert touched == brute_force(ghosts, pacman)
+        hits += bool(touched)
+
+    assert hits > 100
+
+
+def test_grid_agrees_with_brute_force_in_game(app):
+    grid = CollisionGrid()
+    for _ in range(60 * 60):
+        game = app.state
+        creatures = [game.pacman] + game.ghosts
+        grid.rebuild(creatures)
+        for creature in creatures:
+            assert grid.touching(creature) == brute_force(creatures, creature)
+        app.update()
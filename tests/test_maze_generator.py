@@ -0,0 +1,54 @@
+from collections import deque
+
+import pytest
+from app.states.game import Game
+from app.states.game.maze import CellFlag
+from app.states.game.maze_generator import MazeGenerator
+
+SIZES = [(21, 21), (28, 31), (40, 25), (61, 61)]
+
+
+def reachable(grid, start):
+    h, w = len(grid), len(grid[0])
+    seen = {start}
+    q = deque([start])
+    while q:
+        x, y = q.popleft()
+        for dx, dy in ((0, 1), (1, 0), (0, -1), (-1, 0)):
+            v = x + dx, y + dy
+            if 0 <= v[0] < w and 0 <= v[1] < h and v not in seen and \
+               not grid[v[1]][v[0]] & CellFlag.WALL:
+                seen.add(v)
+                q.append(v)
+    return seen
+
+
+@pytest.mark.parametrize('width, height', SIZES)
+@pytest.mark.parametrize('seed', range(5))
+def test_generated_maze_is_connected(width, height, seed):
+    generator = MazeGenerator(width, height, seed)
+    grid = generator.generate()
+    assert len(grid) == height and all(len(row) == width for row in grid)
+
+    walkable = {(x, y) for y, row in enumerate(grid) for x, n in enumerate(row)
+                if not n & CellFlag.WALL}
+    assert reachable(grid, generator.pacman_spawnpoint) == walkable
+
+
+def test_same_seed_gives_same_maze():
+    assert MazeGenerator(41, 41, 7).generate() == MazeGenerator(41, 41, 7).generate()
+    assert MazeGenerator(41, 41, 7).generate() != MazeGenerator(41, 41, 8).generate()
+
+
+def test_too_small_maze_is_rejected():
+    with pytest.raises(ValueError):
+        MazeGenerator(MazeGenerator.MIN_WIDTH - 1, MazeGenerator.MIN_HEIGHT)
+
+
+@pytest.mark.parametrize('width, height', SIZES)
+def test_generated_maze_is_playable(app, width, height):
+    grid = MazeGenerator(width, height, 0).generate()
+    game = Game(app, seed=0, grid=grid)
+    app.state = game
+    for _ in range(600):
+        app.update()
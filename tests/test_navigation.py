@@ -0,0 +1,65 @@
+import random
+from app.simulation import HeadlessApp
+from app.states.game.navigation import NavigationTable
+
+
+def walkable_cells(maze):
+    return [(x, y) for y in range(maze.height_in_cells) for x in range(maze.width_in_cells)
+            if not maze.is_wall((x, y))]
+
+
+def test_table_agrees_with_search(app):
+    game = app.state
+    maze, ghost = game.maze, game.blinky
+    cells = walkable_cells(maze)
+    rng = random.Random(0)
+
+    for _ in range(500):
+        src, dst = rng.choice(cells), rng.choice(cells)
+        ghost.cell = src
+        assert ghost.search_direction(dst) == maze.navigation.next_direction(src, dst)
+
+
+def test_search_returns_none_for_unreachable_goals(app):
+    game = app.state
+    maze, ghost = game.maze, game.blinky
+    ghost.cell = maze.pacman_start
+
+    walls = [(x, y) for y in range(maze.height_in_cells) for x in range(maze.width_in_cells)
+             if maze.is_wall((x, y))]
+    for goal in walls:
+        assert ghost.search_direction(goal) is None
+        assert maze.navigation.next_direction(ghost.cell, goal) is None
+
+    for goal in [(-1, 0), (0, -1), (maze.width_in_cells, 0), (0, maze.height_in_cells)]:
+        assert ghost.search_direction(goal) is None
+
+
+def test_search_returns_none_at_goal(app):
+    ghost = app.state.blinky
+    assert ghost.search_direction(ghost.cell) is None
+
+
+def test_table_is_read_back_from_cache(theme, monkeypatch, tmp_path):
+    monkeypatch.setattr(NavigationTable, '_loaded', {})
+    built = HeadlessApp(theme, lambda game, tick: None).state.maze.navigation
+    assert len(list((tmp_path / 'cache').glob('*.nav'))) == 1
+
+    monkeypatch.setattr(NavigationTable, '_loaded', {})
+    read = HeadlessApp(theme, lambda game, tick: None).state.maze.navigation
+    assert read is not built
+    assert read.distances == built.distances
+    assert read.directions == built.directions
+
+
+def test_flow_field_agrees_with_table(app):
+    maze = app.state.maze
+    cells = walkable_cells(maze)
+    rng = random.Random(0)
+
+    for _ in range(50):
+        target = rng.choice(cells)
+        for cell in rng.sample(cells, 100):
+            assert maze.pacman_flow_field.distance(cell, target) == maze.navigation.distance(cell, target)
+            assert maze.pacman_flow_field.next_direction(cell, target) == \
+                maze.navigation.next_direction(cell, target)
@@ -0,0 +1,24 @@
+import csv
+import os
+import sys
+
+from app.profiler import Profiler
+
+
+def test_dump_goes_to_resource_path(monkeypatch, tmp_path):
+    # Packaged builds look for resources in the unpacked bundle
+    monkeypatch.setattr(sys, '_MEIPASS', str(tmp_path), raising=False)
+
+    profiler = Profiler()
+    profiler.enabled = True
+    for _ in range(3):
+        with profiler.section('update'):
+            pass
+        profiler.end_frame()
+
+    path = profiler.dump()
+    assert os.path.dirname(path) == os.path.join(str(tmp_path), Profiler.DUMP_PATH)
+    with open(path, newline='') as f:
+        rows = list(csv.reader(f))
+    assert 'update_ms' in rows[0]
+    assert len(rows) > 1
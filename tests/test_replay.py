@@ -0,0 +1,36 @@
+from app.simulation import HeadlessApp
+from app.simulation.bots import RandomBot
+from app.simulation.replay import play_replay
+from app.states.game.replay import Replay
+
+
+def record(theme, seed, ticks):
+    app = HeadlessApp(theme, RandomBot(seed), seed=seed)
+    app.run(ticks)
+    return app.state.recorder.finish(app.state)
+
+
+def test_replay_round_trips_through_file(theme, tmp_path):
+    replay = record(theme, 3, 60 * 60)
+    path = str(tmp_path / 'session.rep')
+    replay.save(path)
+
+    loaded = Replay.load(path)
+    assert (loaded.seed, loaded.theme_name, loaded.inputs, loaded.ticks, loaded.score,
+            loaded.lives, loaded.digest) == \
+           (replay.seed, replay.theme_name, replay.inputs, replay.ticks, replay.score,
+            replay.lives, replay.digest)
+
+
+def test_replay_plays_to_same_digest(theme, tmp_path):
+    replay = record(theme, 5, 60 * 60)
+    result, matches = play_replay(replay, theme)
+    assert matches
+    assert result.score == replay.score and result.ticks == replay.ticks
+
+
+def test_changed_inputs_are_detected(theme):
+    replay = record(theme, 5, 60 * 60)
+    replay.inputs = replay.inputs[:len(replay.inputs) // 2]
+    _, matches = play_replay(replay, theme)
+    assert not matches
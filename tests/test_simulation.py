@@ -0,0 +1,36 @@
+from app import App
+from app.simulation import HeadlessApp
+from app.simulation.batch import RESULT_COLUMNS, BatchJob, run_batch
+from app.simulation.bots import RandomBot
+from app.states.game.maze import Maze
+from app.states.game.maze_generator import MazeGenerator
+from app.themes import Theme
+
+
+def test_headless_app_has_app_fields(theme):
+    app = HeadlessApp(theme, RandomBot(0), seed=0)
+    for name in ('profiler', 'profiler_overlay', 'text_cache', 'dirty_rects', 'full_update'):
+        assert hasattr(app, name)
+    assert app.dirty_rects == App.DIRTY_RECTS
+
+
+def test_headless_run_is_deterministic(theme):
+    results = [HeadlessApp(theme, RandomBot(seed), seed=seed).run(60 * 60).as_dict()
+               for seed in (1, 1, 2)]
+    assert results[0] == results[1]
+
+
+def test_batch_plays_given_level(theme, monkeypatch):
+    grid = MazeGenerator(25, 25, seed=3).generate()
+    monkeypatch.setitem(Maze._loaded_levels, 'generated.csv', grid)
+
+    jobs = [BatchJob(seed, {}, 60 * 60) for seed in range(3)]
+    rows = sorted(run_batch(jobs, 1, Theme.get_available()[0], 'generated.csv'), key=lambda row: row['seed'])
+
+    for job, row in zip(jobs, rows):
+        expected = HeadlessApp(theme, RandomBot(job.seed), seed=job.seed, grid=grid).run(job.max_ticks)
+        assert {column: row[column] for column in RESULT_COLUMNS} == expected.as_dict()
+
+    classic = [HeadlessApp(theme, RandomBot(job.seed), seed=job.seed).run(job.max_ticks).as_dict()
+               for job in jobs]
+    assert [{column: row[column] for column in RESULT_COLUMNS} for row in rows] != classic
@@ -0,0 +1,108 @@
+import pygame
+import pytest
+from app.simulation import HeadlessApp
+from app.simulation.bots import RandomBot
+from app.states.game.maze import Maze, MazeCell
+from app.states.game.static_layer import StaticLayer
+from app.themes import Theme
+
+
+@pytest.fixture
+def game(monkeypatch):
+    pygame.display.set_mode((64, 64))
+    monkeypatch.setattr(HeadlessApp, 'SCREEN_SIZE', (800, 600))
+    app = HeadlessApp(Theme.load_theme(Theme.get_available()[0]), RandomBot(0), seed=0)
+    yield app.state
+    pygame.display.quit()
+    pygame.display.init()
+
+
+def pixels(surface):
+    return pygame.image.tobytes(surface, 'RGBA')
+
+
+def test_patched_chunks_match_baked(game):
+    layer = game.static_layer
+    app = game.app
+    patched = 0
+
+    while patched < 20 and app.ticks < 60 * 60 and app.state is game:
+        remaining = game.maze.collectibles.remaining
+        app.update()
+        layer.draw()
+        if game.maze.collectibles.remaining == remaining:
+            continue
+
+        patched += 1
+        for (cx, cy, frame_shift), (surface, topleft) in layer._chunks.items():
+            baked, baked_topleft = layer._bake((cx, cy), frame_shift)
+            assert topleft == baked_topleft
+            assert pixels(surface) == pixels(baked)
+
+    assert patched > 0
+
+
+def test_visible_chunks_overlap_screen(game):
+    layer = game.static_layer
+    sc_w, sc_h = game.app.screen.get_size()
+    ne_x, ne_y = game.maze.ne_corner
+    screen_rect = pygame.Rect(-ne_x, -ne_y, sc_w, sc_h)
+
+    chunks = layer.visible_chunks()
+    assert chunks
+    assert layer.visible_chunks() is chunks
+    assert chunks == sorted(chunks, key=lambda chunk: (chunk[0] + chunk[1], chunk[0]))
+
+    # Every cell whose sprites can reach the screen is in a visible chunk
+    for y in range(game.maze.height_in_cells):
+        for x in range(game.maze.width_in_cells):
+            off_x, off_y = Maze.get_cell_offset((x, y))
+            cell_rect = pygame.Rect(off_x - layer._margin_x, off_y - layer._margin_top,
+                                    2 * layer._margin_x, layer._margin_top + layer._margin_bottom)
+            if cell_rect.colliderect(screen_rect):
+                assert (x // StaticLayer.CHUNK_SIZE, y // StaticLayer.CHUNK_SIZE) in chunks
+
+
+def test_baked_chunks_fit_into_budget(game, monkeypatch):
+    layer = game.static_layer
+    monkeypatch.setattr(StaticLayer, 'BUDGET_BYTES', 1)
+
+    for _ in range(10 * 60):
+        game.app.update()
+        layer.draw()
+        visible = len(layer.visible_chunks())
+        assert len(layer._chunks) == visible
+        assert layer.size_in_bytes == sum(surface.get_pitch() * surface.get_height()
+                                          for surface, _ in layer._chunks.values())
+
+
+def test_animated_collectibles_are_not_baked(game, monkeypatch):
+    layer = game.static_layer
+    screen = game.app.screen
+    sprite = game.app.theme.energizer[0]
+    frame = sprite.frame(0)
+
+    # Camera looks at an energizer
+    maze = game.maze
+    idx = next(idx for idx in range(len(maze.collectibles.flags)) if MazeCell(maze, idx).has_energizer)
+    center = Maze.get_cell_offset((idx % maze.width_in_cells, idx // maze.width_in_cells))
+    monkeypatch.setattr(type(game), 'camera_center', center)
+    layer.draw()
+    static = pixels(screen)
+
+    monkeypatch.setattr(sprite, 'amount', 2)
+    monkeypatch.setattr(sprite, 'frame', lambda idx: frame)
+    layer.invalidate()
+    screen.fill((0, 0, 0))
+    layer.draw()
+
+    assert layer._period == 1
+    assert pixels(screen) == static
+    # Energizers on screen were drawn over chunks
+    differs = 0
+    for (cx, cy, frame_shift), (surface, _) in layer._chunks.items():
+        assert pixels(surface) == pixels(layer._bake((cx, cy), frame_shift)[0])
+        monkeypatch.setattr(sprite, 'amount', 1)
+        differs += pixels(surface) != pixels(layer._bake((cx, cy), frame_shift)[0])
+        monkeypatch.setattr(sprite, 'amount', 2)
+    assert differs > 0
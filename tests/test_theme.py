@@ -0,0 +1,39 @@
+import threading
+
+import pygame
+import pytest
+from app.themes import Theme
+
+
+@pytest.fixture
+def display():
+    pygame.display.set_mode((64, 64))
+    yield
+    pygame.display.quit()
+    pygame.display.init()
+
+
+def load_in_thread(name):
+    loaded = []
+    thread = threading.Thread(target=lambda: loaded.append(Theme.load_theme(name, convert=False)))
+    thread.start()
+    thread.join()
+    return loaded[0]
+
+
+def test_theme_is_converted_on_main_thread(display):
+    name = Theme.get_available()[0]
+    theme = load_in_thread(name)
+    assert not theme.converted
+
+    theme.prefetch()
+    assert all(sprite_type in theme._sprites for sprite_type in Theme.LAZY_SPRITE_TYPES)
+
+    theme.convert()
+    assert theme.converted
+    reference = Theme.load_theme(name)
+    for sprite_type in Theme.SPRITE_TYPES:
+        for sprite, expected in zip(getattr(theme, sprite_type), getattr(reference, sprite_type)):
+            for frame, expected_frame in zip(sprite.surfaces(), expected.surfaces()):
+                assert frame.get_parent() in theme.atlas.pages
+                assert pygame.image.tobytes(frame, 'RGBA') == pygame.image.tobytes(expected_frame, 'RGBA')